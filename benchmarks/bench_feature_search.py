@@ -0,0 +1,141 @@
+"""
+Latency of the feature search modes, with and without the feature search indexes.
+
+Seeds `--users` users with `--features` features of `--values` values each (once,
+they are kept for the next runs unless `--cleanup`). The "without" column runs
+the same searches in a transaction which drops the indexes and is rolled back.
+
+    python -m benchmarks.bench_feature_search --users 200000 --features 5 --values 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from src.core.constants import FeatureMatchModes
+from src.core.database import async_session
+from src.models import User, UserRelatedFeatures, UserRelatedFeatureValue
+from src.repositories import user_repository
+
+EMAIL_PREFIX = "bench_features_"
+TITLES = ("specialty", "language", "city", "skill", "hobby")
+INDEXES = (
+    "ix_user_features_title_user_id",
+    "ix_userrelatedfeaturevalue_feature_id_value",
+    "ix_userrelatedfeaturevalue_value_trgm",
+)
+SEARCHES = (
+    (FeatureMatchModes.EXACT, "cardiology_7"),
+    (FeatureMatchModes.PREFIX, "cardiology_7"),
+    (FeatureMatchModes.FUZZY, "cardiolgy_7"),
+)
+
+
+async def seed(users: int, features: int, values: int):
+    async with async_session() as session:
+        seeded = await session.scalar(
+            select(func.count()).where(User.email.startswith(EMAIL_PREFIX))
+        )
+        if seeded >= users:
+            return
+        await session.execute(
+            text(
+                'INSERT INTO "user" (group_id, first_name, last_name, email, '
+                "is_active, attempts_count) "
+                f"SELECT 2, 'Bench', 'User', '{EMAIL_PREFIX}' || n || '@mail.ru', "
+                "true, 3 FROM generate_series(:start, :stop) AS n"
+            ),
+            {"start": seeded + 1, "stop": users},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO user_features (title, user_id) "
+                f"SELECT (ARRAY{list(TITLES)})[1 + t % {len(TITLES)}], u.id "
+                'FROM "user" u, generate_series(0, :features - 1) AS t '
+                "WHERE u.email LIKE :prefix AND NOT EXISTS "
+                "(SELECT 1 FROM user_features f WHERE f.user_id = u.id)"
+            ),
+            {"features": features, "prefix": f"{EMAIL_PREFIX}%"},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO userrelatedfeaturevalue (value, feature_id) "
+                "SELECT (ARRAY['cardiology', 'neurology', 'oncology', 'surgery'])"
+                "[1 + (f.id + v) % 4] || '_' || (f.id * 7 + v) % 1000, f.id "
+                "FROM user_features f "
+                'JOIN "user" u ON u.id = f.user_id, '
+                "generate_series(0, :values - 1) AS v "
+                "WHERE u.email LIKE :prefix AND NOT EXISTS "
+                "(SELECT 1 FROM userrelatedfeaturevalue fv WHERE fv.feature_id = f.id)"
+            ),
+            {"values": values, "prefix": f"{EMAIL_PREFIX}%"},
+        )
+        await session.execute(text("ANALYZE user_features"))
+        await session.execute(text("ANALYZE userrelatedfeaturevalue"))
+        await session.commit()
+
+
+async def timed(session, match: FeatureMatchModes, value: str, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        await user_repository.search_by_feature(
+            session, title="specialty", value=value, match=match, limit=50
+        )
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1e3
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=5)
+    parser.add_argument("--values", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    await seed(args.users, args.features, args.values)
+
+    with_indexes = {}
+    async with async_session() as session:
+        for match, value in SEARCHES:
+            with_indexes[match] = await timed(session, match, value, args.repeats)
+
+    without_indexes = {}
+    async with async_session() as session:
+        for index in INDEXES:
+            await session.execute(text(f"DROP INDEX {index}"))
+        for match, value in SEARCHES:
+            without_indexes[match] = await timed(session, match, value, args.repeats)
+        await session.rollback()
+
+    print(f"{'match':>8} {'without ms':>11} {'with ms':>9}")
+    for match, _ in SEARCHES:
+        print(
+            f"{match.value:>8} {without_indexes[match]:>11.2f} "
+            f"{with_indexes[match]:>9.2f}"
+        )
+
+    if args.cleanup:
+        async with async_session() as session:
+            users = select(User.id).where(User.email.startswith(EMAIL_PREFIX))
+            features = select(UserRelatedFeatures.id).where(
+                UserRelatedFeatures.user_id.in_(users)
+            )
+            await session.execute(
+                delete(UserRelatedFeatureValue).where(
+                    UserRelatedFeatureValue.feature_id.in_(features)
+                )
+            )
+            await session.execute(
+                delete(UserRelatedFeatures).where(UserRelatedFeatures.id.in_(features))
+            )
+            await session.execute(delete(User).where(User.id.in_(users)))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Login throughput of the password hasher per worker count.
+
+Every login does one bcrypt verification, so verifications per second is
+the upper bound of logins per second for a single application worker.
+
+    python -m benchmarks.bench_hashing --executor process --requests 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from src.core.hashing import PasswordHasher
+
+
+async def _loop_lag(stop: asyncio.Event, samples: list):
+    """Measures how late the event loop wakes up while hashing is in progress"""
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - started_at - 0.01)
+
+
+async def run(executor: str, workers: int, requests: int, rounds: int) -> dict:
+    hasher = PasswordHasher(
+        executor=executor,
+        max_workers=workers,
+        max_queue_depth=requests,
+        rounds=rounds,
+    )
+    hashed = await hasher.hash("Senior1234!")
+    # warming up the pool, process pools are expensive to spawn
+    await asyncio.gather(*(hasher.verify("Senior1234!", hashed) for _ in range(workers)))
+
+    stop, lag = asyncio.Event(), []
+    lag_task = asyncio.create_task(_loop_lag(stop, lag))
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(hasher.verify("Senior1234!", hashed) for _ in range(requests))
+    )
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await lag_task
+    hasher.shutdown()
+
+    return {
+        "workers": workers,
+        "logins_per_second": requests / elapsed,
+        "max_loop_lag_ms": max(lag, default=0) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--executor", default="thread", choices=["thread", "process"])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+    baseline = None
+    print(f"{'workers':>8} {'logins/s':>10} {'speedup':>8} {'loop lag ms':>12}")
+    for workers in worker_counts:
+        result = await run(args.executor, workers, args.requests, args.rounds)
+        baseline = baseline or result["logins_per_second"]
+        print(
+            f"{result['workers']:>8} {result['logins_per_second']:>10.1f} "
+            f"{result['logins_per_second'] / baseline:>8.2f} "
+            f"{result['max_loop_lag_ms']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Latency and statements of `user_repository.apply_diff` on a seeded profile.
+
+Seeds one user with `--features` features of `--values` values each, then applies
+every case to the loaded tree the way `PATCH /profile` does. Each run is rolled back,
+so every case starts from the seeded profile. The user is deleted at the end.
+
+    python -m benchmarks.bench_profile_diff --features 50 --values 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import event
+
+from src.core.constants import UserLoadProfiles
+from src.core.database import async_session, engine
+from src.repositories import build_metadata_registry, user_repository
+from src.schemas.user import UserUpdateSchema
+
+EMAIL = f"bench_diff_{int(time.time())}@mail.ru"
+
+
+def _features(features: int, values: int, prefix: str = "") -> list[dict]:
+    return [
+        {
+            "title": f"{prefix}feature {feature}",
+            "values": [{"value": f"{prefix}value {value}"} for value in range(values)],
+        }
+        for feature in range(features)
+    ]
+
+
+def _payload(**fields) -> dict:
+    return UserUpdateSchema(**fields).model_dump(exclude_unset=True)
+
+
+async def seed(features: int, values: int) -> int:
+    async with async_session() as session:
+        await user_repository.create_user(
+            session,
+            dict(first_name="Bench", last_name="User", email=EMAIL, password=b""),
+        )
+        user = await user_repository.get_user(
+            session=session, profile=UserLoadProfiles.FULL, email=EMAIL
+        )
+        await user_repository.apply_diff(
+            session, user, _payload(features=_features(features, values))
+        )
+        await session.commit()
+        return user.id
+
+
+def cases(user, features: int, values: int) -> dict[str, dict]:
+    """Returns the payloads built from the loaded profile"""
+
+    current = [
+        {
+            "id": feature.id,
+            "title": feature.title,
+            "values": [
+                {"id": value.id, "value": value.value} for value in feature.values
+            ],
+        }
+        for feature in user.features
+    ]
+    first_value, *other_values = current[0]["values"]
+    one_changed = [
+        {**current[0], "values": [{**first_value, "value": "changed"}, *other_values]},
+        *current[1:],
+    ]
+    return {
+        "resubmitted": _payload(features=current),
+        "resubmitted without ids": _payload(features=_features(features, values)),
+        "one value changed": _payload(features=one_changed),
+        "replaced": _payload(features=_features(features, values, prefix="new ")),
+    }
+
+
+async def run(user_id: int, payload_factory, repeats: int) -> tuple[float, int]:
+    """Returns the median milliseconds and the statements count of `apply_diff`"""
+
+    statements = []
+
+    def collect(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    timings = []
+    for _ in range(repeats):
+        async with async_session() as session:
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.FULL, id=user_id
+            )
+            payload = payload_factory(user)
+            statements.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", collect)
+            started_at = time.perf_counter()
+            try:
+                await user_repository.apply_diff(session, user, payload)
+            finally:
+                timings.append(time.perf_counter() - started_at)
+                event.remove(engine.sync_engine, "before_cursor_execute", collect)
+                await session.rollback()
+    return statistics.median(timings) * 1000, len(statements)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=50)
+    parser.add_argument("--values", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    build_metadata_registry()
+    user_id = await seed(args.features, args.values)
+    try:
+        print(f"{'case':>24} {'ms':>8} {'statements':>10}")
+        for case in (
+            "resubmitted",
+            "resubmitted without ids",
+            "one value changed",
+            "replaced",
+        ):
+            milliseconds, statements = await run(
+                user_id,
+                lambda user: cases(user, args.features, args.values)[case],
+                args.repeats,
+            )
+            print(f"{case:>24} {milliseconds:>8.2f} {statements:>10}")
+    finally:
+        async with async_session() as session:
+            await user_repository.delete_user(session, user_id)
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Column lookup overhead of the generic relation walker, before and after the metadata
+registry. `before` runs `inspect(model)` and `key in ColumnCollection` membership tests
+on every call, `after` reads the cached column names. No database is needed.
+`benchmarks.bench_profile_diff` measures `apply_diff` itself against the database.
+
+    python -m benchmarks.bench_relation_planning --features 50 --values 10
+"""
+import argparse
+import timeit
+
+from sqlalchemy import inspect
+
+from src.models import User
+from src.repositories import user_repository
+from src.repositories._metadata import build_metadata_registry, get_model_metadata
+from src.schemas.user import UserUpdateSchema
+
+
+def _payload(features: int, values: int) -> dict:
+    return UserUpdateSchema(
+        first_name="Bench",
+        features=[
+            {
+                "title": f"feature {feature}",
+                "values": [{"value": f"value {value}"} for value in range(values)],
+            }
+            for feature in range(features)
+        ],
+    ).model_dump(exclude_unset=True)
+
+
+def preparing_base_fields_before(payload: dict):
+    return user_repository.preparing_base_fields(inspect(User).columns, payload)
+
+
+def preparing_base_fields_after(payload: dict):
+    columns = get_model_metadata(User).columns
+    return user_repository.preparing_base_fields(columns, payload)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=50)
+    parser.add_argument("--values", type=int, default=10)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    build_metadata_registry()
+    payload = _payload(args.features, args.values)
+
+    print(f"{'case':>24} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    cases = (
+        (
+            "preparing_base_fields",
+            preparing_base_fields_before,
+            preparing_base_fields_after,
+        ),
+    )
+    for case, before, after in cases:
+        assert before(payload) == after(payload)
+        before_seconds = timeit.timeit(lambda: before(payload), number=args.number)
+        after_seconds = timeit.timeit(lambda: after(payload), number=args.number)
+        print(
+            f"{case:>24} {before_seconds / args.number * 1e6:>10.1f} "
+            f"{after_seconds / args.number * 1e6:>10.1f} "
+            f"{before_seconds / after_seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Sign and verify throughput per supported JWT algorithm.
+
+Every login and refresh signs two tokens, every authenticated request
+without a cached token verifies one.
+
+    python -m benchmarks.bench_signing --iterations 2000
+"""
+import argparse
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from src.core.constants import SUPPORTED_SIGNING_ALGORITHMS
+
+KEY_FACTORIES = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": lambda: ed25519.Ed25519PrivateKey.generate(),
+}
+
+
+def _payload() -> dict:
+    return {
+        "sub": f"UI_1_{int(time.time())}",
+        "token_type": "access",
+        "jti": uuid.uuid4().hex,
+        "exp": int(time.time() + 900),
+        "iat": time.time(),
+    }
+
+
+def run(algorithm: str, iterations: int) -> dict:
+    private_key = KEY_FACTORIES[algorithm]()
+    public_key = private_key.public_key()
+
+    started_at = time.perf_counter()
+    tokens = [
+        jwt.encode(_payload(), private_key, algorithm, headers={"kid": algorithm})
+        for _ in range(iterations)
+    ]
+    sign_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    for token in tokens:
+        jwt.decode(token, public_key, [algorithm])
+    verify_seconds = time.perf_counter() - started_at
+
+    return {
+        "algorithm": algorithm,
+        "sign_per_second": iterations / sign_seconds,
+        "verify_per_second": iterations / verify_seconds,
+        "token_length": len(tokens[0]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':>10} {'sign/s':>10} {'verify/s':>10} {'token bytes':>12}")
+    for algorithm in SUPPORTED_SIGNING_ALGORITHMS:
+        result = run(algorithm, args.iterations)
+        print(
+            f"{result['algorithm']:>10} {result['sign_per_second']:>10.0f} "
+            f"{result['verify_per_second']:>10.0f} {result['token_length']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Latency of the authenticated part of `GET /profile` with the verified-JWT cache on and off.
+
+The revocation index is marked fresh, so the measured path never touches the database
+and the difference between the runs is the RS256 verification.
+
+    python -m benchmarks.bench_token_cache --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.core.jwt_cache import verified_token_cache
+from src.core.revocation import revocation_index
+from src.utils.auth_helpers import (
+    create_refresh_and_access_tokens,
+    validate_authenticated_user_token,
+)
+
+
+async def run(requests: int, cache_enabled: bool) -> list[float]:
+    verified_token_cache.clear()
+    verified_token_cache.enabled = cache_enabled
+    revocation_index._synced_at = time.monotonic() + 3600
+
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer",
+        credentials=create_refresh_and_access_tokens(user_id=1).access_token,
+    )
+    timings = []
+    for _ in range(requests):
+        started_at = time.perf_counter()
+        await validate_authenticated_user_token(token=credentials, session=None)
+        timings.append(time.perf_counter() - started_at)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'cache':>6} {'p50 us':>8} {'p99 us':>8} {'req/s':>10}")
+    for cache_enabled in (False, True):
+        timings = await run(args.requests, cache_enabled)
+        percentiles = statistics.quantiles(timings, n=100)
+        print(
+            f"{'on' if cache_enabled else 'off':>6} "
+            f"{percentiles[49] * 1e6:>8.1f} {percentiles[98] * 1e6:>8.1f} "
+            f"{len(timings) / sum(timings):>10.0f}"
+        )
+    print(verified_token_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
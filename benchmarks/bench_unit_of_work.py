@@ -0,0 +1,119 @@
+"""
+Commits per request and request latency of the write endpoints.
+
+Every user goes through register, verify, login, profile patch, refresh and logout
+against the configured database. COMMITs are counted on the engine, so the numbers
+include the commits of every layer. Run it on the revision before the unit of work
+for the "before" column.
+
+    python -m benchmarks.bench_unit_of_work --users 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from main import app
+from src.core.configs import settings
+from src.core.database import async_session, engine
+from src.repositories import user_repository
+
+PREFIX = f"{settings.api_version}/auth"
+PASSWORD = "Senior1234!"
+
+
+class Recorder:
+    def __init__(self):
+        self.commits = 0
+        self.timings: dict[str, list[float]] = defaultdict(list)
+        self.request_commits: dict[str, list[int]] = defaultdict(list)
+
+    async def call(self, client: AsyncClient, name: str, method: str, url: str, **kw):
+        commits_before = self.commits
+        started_at = time.perf_counter()
+        response = await client.request(method, f"{PREFIX}{url}", **kw)
+        self.timings[name].append(time.perf_counter() - started_at)
+        self.request_commits[name].append(self.commits - commits_before)
+        response.raise_for_status()
+        return response.json()
+
+
+async def _otp_code(email: str) -> str:
+    async with async_session() as session:
+        return (await user_repository.get_user(session=session, email=email)).otp_code
+
+
+async def user_flow(client: AsyncClient, recorder: Recorder, index: int):
+    email = f"bench_uow_{index}_{int(time.time())}@mail.ru"
+    await recorder.call(
+        client,
+        "register",
+        "POST",
+        "/register",
+        json=dict(first_name="Bench", last_name="User", email=email, password=PASSWORD),
+    )
+    await recorder.call(
+        client,
+        "verify",
+        "POST",
+        "/verify",
+        json=dict(email=email, otp_code=await _otp_code(email)),
+    )
+    tokens = await recorder.call(
+        client, "login", "POST", "/login", json=dict(email=email, password=PASSWORD)
+    )
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    await recorder.call(
+        client,
+        "patch profile",
+        "PATCH",
+        "/profile",
+        headers=headers,
+        json=dict(features=[dict(title="languages", values=[dict(value="en")])]),
+    )
+    tokens = await recorder.call(
+        client,
+        "refresh",
+        "POST",
+        "/refresh",
+        json=dict(refresh_token=tokens["refresh_token"]),
+    )
+    await recorder.call(
+        client,
+        "logout",
+        "GET",
+        "/logout",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    recorder = Recorder()
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def count_commit(_):
+        recorder.commits += 1
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        for index in range(args.users):
+            await user_flow(client, recorder, index)
+
+    print(f"{'endpoint':>14} {'commits/req':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, timings in recorder.timings.items():
+        percentiles = statistics.quantiles(timings, n=100)
+        print(
+            f"{name:>14} {statistics.mean(recorder.request_commits[name]):>12.2f} "
+            f"{percentiles[49] * 1e3:>8.2f} {percentiles[98] * 1e3:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
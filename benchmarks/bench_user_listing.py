@@ -0,0 +1,112 @@
+"""
+Page latency of the admin user listing, OFFSET pages against keyset pages.
+
+Seeds `--rows` users (once, they are kept for the next runs unless `--cleanup`)
+and reads one page at growing depths. OFFSET pages slow down with the depth,
+keyset pages read the (created_at, id) index range after the cursor only.
+
+    python -m benchmarks.bench_user_listing --rows 1000000 --page-size 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from src.core.database import async_session
+from src.models import User
+from src.repositories import user_repository
+from src.schemas.user import UserFilterSchema
+
+EMAIL_PREFIX = "bench_list_"
+
+
+async def seed(rows: int):
+    async with async_session() as session:
+        seeded = await session.scalar(
+            select(func.count()).where(User.email.startswith(EMAIL_PREFIX))
+        )
+        if seeded >= rows:
+            return
+        await session.execute(
+            text(
+                'INSERT INTO "user" (group_id, first_name, last_name, email, '
+                "is_active, attempts_count, created_at) "
+                "SELECT 1 + n % 3, 'Bench', 'User', "
+                f"'{EMAIL_PREFIX}' || n || '@mail.ru', n % 5 <> 0, 3, "
+                "now() - make_interval(secs => n) "
+                "FROM generate_series(:start, :stop) AS n"
+            ),
+            {"start": seeded + 1, "stop": rows},
+        )
+        await session.execute(text('ANALYZE "user"'))
+        await session.commit()
+
+
+async def offset_page(session, filters: UserFilterSchema, depth: int, limit: int):
+    stmt = (
+        select(User.id, User.created_at)
+        .where(*user_repository.filter_criteria(filters))
+        .order_by(User.created_at.desc(), User.id.desc())
+        .offset(depth)
+        .limit(limit)
+    )
+    return list(await session.execute(stmt))
+
+
+async def timed(coroutine_factory, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        await coroutine_factory()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1e3
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--group-id", type=int)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    await seed(args.rows)
+    filters = UserFilterSchema(group_id=args.group_id)
+    depths = [
+        depth
+        for depth in (0, 1_000, 10_000, 100_000, 500_000, 900_000)
+        if depth < args.rows
+    ]
+
+    print(f"{'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+    async with async_session() as session:
+        for depth in depths:
+            cursor = None
+            if depth:
+                (previous,) = await offset_page(session, filters, depth - 1, 1)
+                cursor = (previous.created_at, previous.id)
+            offset_ms = await timed(
+                lambda: offset_page(session, filters, depth, args.page_size),
+                args.repeats,
+            )
+            keyset_ms = await timed(
+                lambda: user_repository.list_users(
+                    session, filters, limit=args.page_size, after=cursor
+                ),
+                args.repeats,
+            )
+            print(f"{depth:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+    if args.cleanup:
+        async with async_session() as session:
+            await session.execute(
+                delete(User).where(User.email.startswith(EMAIL_PREFIX))
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from src.core.configs import BASE_DIR
+from src.core.configs import BASE_DIR, settings
+from src.core.database import async_session
+from src.core.hashing import import_password_hasher, password_hasher
+from src.core.keys import key_manager
+from src.repositories import build_metadata_registry
+from src.routers.admin import admin_router
 from src.routers.user import user_router
+from src.routers.well_known import well_known_router
+from src.services import token_maintenance_service
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    key_manager.load()
+    build_metadata_registry()
+    async with async_session() as session:
+        await token_maintenance_service.ensure_partitions(session)
+    purge_task = None
+    if settings.maintenance.token_purge_interval:
+        purge_task = asyncio.create_task(
+            token_maintenance_service.run_periodically(
+                settings.maintenance.token_purge_interval
+            )
+        )
+    yield
+    if purge_task:
+        purge_task.cancel()
+    password_hasher.shutdown()
+    import_password_hasher.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=BASE_DIR / "src" / "static"), name="static")
 app.include_router(user_router)
+app.include_router(well_known_router)
+app.include_router(admin_router)
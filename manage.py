@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+
+from src.core.constants import DataFormats
+from src.core.database import async_session
+from src.core.hashing import import_password_hasher
+from src.schemas.user import UserFilterSchema
+from src.services import (
+    profile_snapshot_service,
+    token_maintenance_service,
+    user_export_service,
+    user_import_service,
+)
+
+
+async def purge_tokens(args: argparse.Namespace):
+    async with async_session() as session:
+        removed_rows = await token_maintenance_service.purge(
+            session, batch_size=args.batch_size
+        )
+    print(f"Removed {removed_rows} token rows.")
+
+
+async def partition_tokens(_: argparse.Namespace):
+    async with async_session() as session:
+        await token_maintenance_service.partition(session)
+    print("Token table is partitioned by creation time.")
+
+
+async def import_users(args: argparse.Namespace):
+    data_format = DataFormats(args.format or args.path.suffix.lstrip(".").lower())
+    report = open(args.report, "w") if args.report else sys.stderr
+    try:
+        with open(args.path, encoding="utf-8", newline="") as lines:
+            summary = await user_import_service.import_users(
+                lines=lines,
+                data_format=data_format,
+                activate=args.activate,
+                on_error=lambda error: print(error.model_dump_json(), file=report),
+            )
+    finally:
+        import_password_hasher.shutdown()
+        if args.report:
+            report.close()
+    print(
+        f"Imported {summary.imported} of {summary.total} users, "
+        f"{summary.failed} failed, in {summary.seconds:.1f}s "
+        f"({summary.rows_per_second:.0f} rows/s)."
+    )
+
+
+async def export_users(args: argparse.Namespace):
+    filters = UserFilterSchema(
+        group_id=args.group_id,
+        is_active=args.is_active,
+        created_from=args.created_from,
+        created_to=args.created_to,
+        last_login_from=args.last_login_from,
+        last_login_to=args.last_login_to,
+    )
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        async with async_session() as session:
+            async for chunk in user_export_service.export_users(
+                session, data_format=DataFormats(args.format), filters=filters
+            ):
+                output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+async def check_snapshots(args: argparse.Namespace):
+    async with async_session() as session:
+        report = await profile_snapshot_service.check(
+            session, batch_size=args.batch_size
+        )
+    print(
+        f"Checked {report['checked']} users, {report['drifted']} drifted "
+        f"and {report['missing']} missing features snapshots."
+    )
+    if report["drifted"] or report["missing"]:
+        sys.exit(1)
+
+
+async def rebuild_snapshots(args: argparse.Namespace):
+    async with async_session() as session:
+        rebuilt = await profile_snapshot_service.rebuild(
+            session, batch_size=args.batch_size
+        )
+    print(f"Rebuilt {rebuilt} features snapshots.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    purge_parser = commands.add_parser(
+        "purge-tokens", help="Deletes expired and revoked tokens"
+    )
+    purge_parser.add_argument("--batch-size", type=int, default=None)
+    purge_parser.set_defaults(handler=purge_tokens)
+
+    partition_parser = commands.add_parser(
+        "partition-tokens", help="Range partitions the token table by creation time"
+    )
+    partition_parser.set_defaults(handler=partition_tokens)
+
+    import_parser = commands.add_parser(
+        "import-users", help="Imports users from a CSV or NDJSON file"
+    )
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument(
+        "--format", choices=[data_format.value for data_format in DataFormats]
+    )
+    import_parser.add_argument(
+        "--activate", action="store_true", help="Imports users as verified"
+    )
+    import_parser.add_argument(
+        "--report", type=Path, help="NDJSON file of the row errors, stderr by default"
+    )
+    import_parser.set_defaults(handler=import_users)
+
+    export_parser = commands.add_parser(
+        "export-users", help="Exports users with their features as NDJSON or CSV"
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=[data_format.value for data_format in DataFormats],
+        default=DataFormats.NDJSON.value,
+    )
+    export_parser.add_argument("--output", type=Path, help="stdout by default")
+    export_parser.add_argument("--group-id", type=int)
+    export_parser.add_argument(
+        "--is-active", type=lambda value: value.lower() in ("1", "true", "yes")
+    )
+    export_parser.add_argument("--created-from", type=datetime.datetime.fromisoformat)
+    export_parser.add_argument("--created-to", type=datetime.datetime.fromisoformat)
+    export_parser.add_argument(
+        "--last-login-from", type=datetime.datetime.fromisoformat
+    )
+    export_parser.add_argument("--last-login-to", type=datetime.datetime.fromisoformat)
+    export_parser.set_defaults(handler=export_users)
+
+    check_parser = commands.add_parser(
+        "check-snapshots",
+        help="Compares the user features snapshots with the features tables",
+    )
+    check_parser.add_argument("--batch-size", type=int, default=None)
+    check_parser.set_defaults(handler=check_snapshots)
+
+    rebuild_parser = commands.add_parser(
+        "rebuild-snapshots",
+        help="Rewrites the drifted and missing user features snapshots",
+    )
+    rebuild_parser.add_argument("--batch-size", type=int, default=None)
+    rebuild_parser.set_defaults(handler=rebuild_snapshots)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,12 +27,53 @@ class DBSettings(BaseSettings):
 class AuthSettings(BaseSettings):
     private_key_path: Path = BASE_DIR / "src" / "certs" / "jwt-private.pem"
     public_key_path: Path = BASE_DIR / "src" / "certs" / "jwt-public.pem"
-    algorithm: str = "RS256"
+    verification_keys_dir: Path = BASE_DIR / "src" / "certs" / "verification"
+    key_reload_interval: int = 60  # in seconds
+    jwks_max_age: int = 3600  # in seconds
+    algorithm: str = "RS256"  # RS256, ES256 or EdDSA
     token_type: str = "Bearer"
     access_token_lifetime: int = 15  # in minutes
     refresh_token_lifetime: int = 1  # in minutes
     password_min_length: int = 6
     password_max_length: int = 12
+    otp_length: int = 6
+    otp_lifetime: int = 10  # in minutes
+    stateless_validation: bool = True
+    revocation_staleness: int = 30  # in seconds
+    token_cache_enabled: bool = True
+    token_cache_size: int = 10_000
+
+
+class HashingSettings(BaseSettings):
+    executor: str = "thread"  # `thread` or `process`
+    max_workers: int | None = None  # defaults to the number of CPUs
+    max_queue_depth: int = 256  # pending + running hash operations
+    bcrypt_rounds: int = 12
+
+
+class MaintenanceSettings(BaseSettings):
+    token_purge_interval: int = 3600  # in seconds, 0 disables the background job
+    token_purge_batch_size: int = 5000
+    token_partitions_ahead: int = 2  # in months, for the partitioned token table
+    snapshot_batch_size: int = 1000  # users checked or rebuilt per transaction
+
+
+class CacheSettings(BaseSettings):
+    profile_cache_backend: str = "memory"  # `memory`, `shared` or `disabled`
+    profile_cache_size: int = 10_000
+    profile_cache_ttl: int = 300  # in seconds
+    shared_cache_url: str = "redis://localhost:6379/0"
+    features_snapshot: bool = True  # profile features kept on the user row
+
+
+class ImportSettings(BaseSettings):
+    chunk_size: int = 1000  # rows validated, hashed and copied together
+    hash_workers: int | None = None  # hashing processes, defaults to the number of CPUs
+    max_reported_errors: int = 1000  # row errors returned by the admin endpoint
+
+
+class ExportSettings(BaseSettings):
+    batch_size: int = 1000  # rows fetched from the server-side cursor at once
 
 
 class FileSettings(BaseSettings):
@@ -46,6 +87,11 @@ class Settings(BaseSettings):
     db: DBSettings = DBSettings()
     file: FileSettings = FileSettings()
     auth: AuthSettings = AuthSettings()
+    hashing: HashingSettings = HashingSettings()
+    maintenance: MaintenanceSettings = MaintenanceSettings()
+    cache: CacheSettings = CacheSettings()
+    imports: ImportSettings = ImportSettings()
+    exports: ExportSettings = ExportSettings()
 
 
 settings = Settings()
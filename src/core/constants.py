@@ -14,9 +14,38 @@ DENY_ACTION = "DENY"
 
 PASSWORD_CHECKER_PATTERN = "^(?=.*\d)(?=.*[a-z])(?=.*[A-Z])(?=.*[a-zA-Z]).{6,}$"
 TOKEN_PARTITIONS_NUMBER = 3
-OTP_GENERATION_DIVISION = 100_0000
+SUPPORTED_SIGNING_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+OTP_MAX_ATTEMPTS = 3
+ADMIN_GROUP_ID = 4
+
+# Listing constants
+
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 500
 
 
 class TokenTypes(Enum):
     ACCESS = "access"
     REFRESH = "refresh"
+
+
+class OTPPurposes(Enum):
+    VERIFICATION = "verification"
+    PASSWORD_RESET = "password_reset"
+
+
+class DataFormats(Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class UserLoadProfiles(Enum):
+    AUTH = "auth"
+    SUMMARY = "summary"
+    FULL = "full"
+
+
+class FeatureMatchModes(Enum):
+    EXACT = "exact"
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+
+from bcrypt import gensalt, hashpw, checkpw
+
+from src.core.configs import settings
+from src.exceptions.base_exceptions import ServiceIsBusy
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    """Runs inside the worker pool, must stay a picklable module level function"""
+    return hashpw(password, gensalt(rounds))
+
+
+def _check(password: bytes, hashed_password: bytes) -> bool:
+    """Runs inside the worker pool, must stay a picklable module level function"""
+    return checkpw(password, hashed_password)
+
+
+@dataclass
+class HashingMetrics:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    busy_seconds: float = 0.0
+
+    def snapshot(self) -> dict:
+        """Returns a plain dict of the current counters"""
+        data = asdict(self)
+        data["avg_seconds"] = (
+            self.busy_seconds / self.completed if self.completed else 0.0
+        )
+        return data
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded worker pool,
+    so the event loop is never blocked by the key derivation.
+    """
+
+    def __init__(
+        self,
+        executor: str = THREAD_EXECUTOR,
+        max_workers: int | None = None,
+        max_queue_depth: int = 256,
+        rounds: int = 12,
+    ):
+        if executor not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+            raise ValueError(f"Unsupported hashing executor `{executor}`")
+
+        self.executor_type = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.rounds = rounds
+        self.metrics = HashingMetrics()
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """Lazily creates the worker pool"""
+        if self._executor is None:
+            pool_class = (
+                ThreadPoolExecutor
+                if self.executor_type == THREAD_EXECUTOR
+                else ProcessPoolExecutor
+            )
+            self._executor = pool_class(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func, *args):
+        """Submits a job to the pool, rejects it when the queue depth limit is reached"""
+
+        if self.metrics.in_flight >= self.max_queue_depth:
+            self.metrics.rejected += 1
+            raise ServiceIsBusy
+
+        self.metrics.submitted += 1
+        self.metrics.in_flight += 1
+        self.metrics.max_in_flight = max(
+            self.metrics.max_in_flight, self.metrics.in_flight
+        )
+        started_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        finally:
+            self.metrics.in_flight -= 1
+
+        self.metrics.completed += 1
+        self.metrics.busy_seconds += time.perf_counter() - started_at
+        return result
+
+    async def hash(self, password: str) -> bytes:
+        """Returns hashed password."""
+        return await self._run(_hash, password.encode(), self.rounds)
+
+    async def verify(self, password: str, hashed_password: bytes) -> bool:
+        """Validates and returns whether the password matches the hash."""
+        return await self._run(_check, password.encode(), hashed_password)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.hashing.executor,
+    max_workers=settings.hashing.max_workers,
+    max_queue_depth=settings.hashing.max_queue_depth,
+    rounds=settings.hashing.bcrypt_rounds,
+)
+
+import_password_hasher = PasswordHasher(
+    executor=PROCESS_EXECUTOR,
+    max_workers=settings.imports.hash_workers,
+    max_queue_depth=settings.imports.chunk_size,
+    rounds=settings.hashing.bcrypt_rounds,
+)
@@ -0,0 +1,104 @@
+import datetime
+import hashlib
+import uuid
+from collections import OrderedDict
+
+from src.core.configs import settings
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified token claims keyed by the token digest,
+    so the signature of a token is verified once per its lifetime instead of once per request.
+    """
+
+    def __init__(self, maxsize: int, enabled: bool = True):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._digests: dict[uuid.UUID, bytes] = {}  # jti -> digest
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(token: str | bytes) -> bytes:
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.sha256(token).digest()
+
+    @staticmethod
+    def _token_id(claims: dict) -> uuid.UUID | None:
+        try:
+            return uuid.UUID(hex=claims["jti"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _evict(self, digest: bytes):
+        claims = self._entries.pop(digest, None)
+        if claims and (jti := self._token_id(claims)):
+            self._digests.pop(jti, None)
+
+    def get(self, token: str | bytes) -> dict | None:
+        """Returns cached claims, tokens whose `exp` has passed are evicted"""
+
+        if not self.enabled:
+            return None
+
+        digest = self._digest(token)
+        claims = self._entries.get(digest)
+        if claims is None:
+            self.misses += 1
+            return None
+
+        if claims["exp"] < datetime.datetime.now().timestamp():
+            self._evict(digest)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return dict(claims)
+
+    def set(self, token: str | bytes, claims: dict):
+        """Stores verified claims, the least recently used entry is evicted on overflow"""
+
+        if not self.enabled:
+            return
+
+        digest = self._digest(token)
+        self._entries[digest] = dict(claims)
+        self._entries.move_to_end(digest)
+        if jti := self._token_id(claims):
+            self._digests[jti] = digest
+
+        while len(self._entries) > self.maxsize:
+            self._evict(next(iter(self._entries)))
+
+    def invalidate(self, jti: uuid.UUID):
+        """Evicts the token by its id, uses when the token is revoked"""
+        if digest := self._digests.get(jti):
+            self._evict(digest)
+
+    def clear(self):
+        self._entries.clear()
+        self._digests.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+        }
+
+
+verified_token_cache = VerifiedTokenCache(
+    maxsize=settings.auth.token_cache_size,
+    enabled=settings.auth.token_cache_enabled,
+)
@@ -0,0 +1,206 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import get_default_algorithms
+
+from src.core.configs import settings
+from src.core.constants import SUPPORTED_SIGNING_ALGORITHMS
+from src.exceptions.auth_exceptions import UnAuthorized
+
+logger = logging.getLogger(__name__)
+
+# RFC 7638 required members of the JWK per key type
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def key_algorithm(key) -> str:
+    """Returns the JWS algorithm of the key object"""
+
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(
+        key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)
+    ) and isinstance(key.curve, ec.SECP256R1):
+        return "ES256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type `{type(key).__name__}`")
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: str
+    algorithm: str
+    key: Any
+    jwk: dict
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    key: Any
+
+
+def _public_jwk(public_key, algorithm: str) -> dict:
+    """Returns the public JWK, `kid` is the RFC 7638 thumbprint of the key"""
+
+    jwk = json.loads(get_default_algorithms()[algorithm].to_jwk(public_key))
+    thumbprint_source = json.dumps(
+        {member: jwk[member] for member in THUMBPRINT_MEMBERS[jwk["kty"]]},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    kid = (
+        base64.urlsafe_b64encode(hashlib.sha256(thumbprint_source.encode()).digest())
+        .rstrip(b"=")
+        .decode()
+    )
+    return {**jwk, "kid": kid, "alg": algorithm, "use": "sig"}
+
+
+class KeyManager:
+    """
+    Loads the signing key and the verification keys once as key objects.
+    The active key signs tokens with the configured algorithm and tags them with its `kid`,
+    the old public keys from `verification_keys_dir` keep verifying tokens during rotation,
+    each with the algorithm of its own key type. The signing algorithm is read at startup,
+    switching it needs a restart, the old keys keep verifying the tokens signed before.
+    Changed key files are picked up without restart, at most every `reload_interval` seconds,
+    a failed reload (e.g. half replaced key files) keeps the previous keys and is retried.
+    """
+
+    def __init__(
+        self,
+        private_key_path: Path,
+        public_key_path: Path,
+        verification_keys_dir: Path,
+        algorithm: str,
+        reload_interval: int = 60,
+    ):
+        if algorithm not in SUPPORTED_SIGNING_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported signing algorithm `{algorithm}`, "
+                f"use one of {', '.join(SUPPORTED_SIGNING_ALGORITHMS)}"
+            )
+
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.verification_keys_dir = verification_keys_dir
+        self.algorithm = algorithm
+        self.reload_interval = reload_interval
+        self._signing_key: SigningKey | None = None
+        self._verification_keys: dict[str, VerificationKey] = {}
+        self._jwks: dict = {"keys": []}
+        self._fingerprint: tuple = ()
+        self._checked_at: float = 0.0
+
+    def _key_files(self) -> list[Path]:
+        files = [self.public_key_path]
+        if self.verification_keys_dir.is_dir():
+            files.extend(sorted(self.verification_keys_dir.glob("*.pem")))
+        return files
+
+    def _current_fingerprint(self) -> tuple:
+        return tuple(
+            (str(path), os.stat(path).st_mtime_ns)
+            for path in [self.private_key_path, *self._key_files()]
+        )
+
+    def load(self):
+        """(Re)loads every key from the disk"""
+
+        private_key = load_pem_private_key(
+            self.private_key_path.read_bytes(), password=None
+        )
+        if key_algorithm(private_key) != self.algorithm:
+            raise ValueError(
+                f"{self.private_key_path} is not a `{self.algorithm}` key, "
+                f"it is a `{key_algorithm(private_key)}` one"
+            )
+
+        verification_keys = {}
+        for path in self._key_files():
+            public_key = load_pem_public_key(path.read_bytes())
+            algorithm = key_algorithm(public_key)
+            jwk = _public_jwk(public_key, algorithm)
+            verification_keys[jwk["kid"]] = VerificationKey(
+                kid=jwk["kid"], algorithm=algorithm, key=public_key, jwk=jwk
+            )
+
+        signing_kid = _public_jwk(private_key.public_key(), self.algorithm)["kid"]
+        if signing_kid not in verification_keys:
+            raise ValueError(
+                f"{self.public_key_path} is not the public key of {self.private_key_path}"
+            )
+
+        self._signing_key = SigningKey(
+            kid=signing_kid, algorithm=self.algorithm, key=private_key
+        )
+        self._verification_keys = verification_keys
+        self._jwks = {"keys": [key.jwk for key in verification_keys.values()]}
+        self._fingerprint = self._current_fingerprint()
+        self._checked_at = time.monotonic()
+
+    def _refresh(self):
+        """Loads the keys at the first use and reloads them once the key files change"""
+
+        if self._signing_key is None:
+            self.load()
+            return
+
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+
+        self._checked_at = time.monotonic()
+        try:
+            if self._current_fingerprint() != self._fingerprint:
+                self.load()
+        except (OSError, TypeError, ValueError, UnsupportedAlgorithm):
+            logger.exception("Key reload failed, the previous keys stay in use")
+
+    @property
+    def signing_key(self) -> SigningKey:
+        self._refresh()
+        return self._signing_key
+
+    def verification_key(self, kid: str | None = None) -> VerificationKey:
+        """Returns the verification key by `kid`, tokens without `kid` are checked by the active key"""
+
+        self._refresh()
+        if kid is None:
+            kid = self._signing_key.kid
+        if (key := self._verification_keys.get(kid)) is None:
+            raise UnAuthorized
+        return key
+
+    @property
+    def jwks(self) -> dict:
+        self._refresh()
+        return self._jwks
+
+
+key_manager = KeyManager(
+    private_key_path=settings.auth.private_key_path,
+    public_key_path=settings.auth.public_key_path,
+    verification_keys_dir=settings.auth.verification_keys_dir,
+    algorithm=settings.auth.algorithm,
+    reload_interval=settings.auth.key_reload_interval,
+)
@@ -0,0 +1,241 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from src.core.configs import settings
+
+try:
+    from redis import asyncio as redis
+except ImportError:  # the shared backend is optional
+    redis = None
+
+
+class ProfileCacheBackend(ABC):
+    """
+    Storage of the serialized profiles, keyed by the user id and its version.
+    Invalidation bumps the version, so a profile read before the bump is never stored
+    under the new one. A version is kept for `ttl` seconds after its last bump or
+    the last entry stored under it, whichever is later, so it outlives the entries
+    of its own and of the previous versions and a version which restarts from 0
+    never meets an entry stored under a later one.
+    """
+
+    @abstractmethod
+    async def version(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str, version: int) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, version: int, value: bytes):
+        """Stores the value unless the key was invalidated after `version` was read"""
+
+    @abstractmethod
+    async def invalidate(self, key: str):
+        ...
+
+    def usage(self) -> dict:
+        """Returns the entries and versions counts and the values memory, if known"""
+        return {"entries": None, "versions": None, "memory_bytes": None}
+
+
+class MemoryBackend(ProfileCacheBackend):
+    """In-process bounded LRU, entries live for `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, int, bytes]] = OrderedDict()
+        self._versions: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._memory_bytes = 0
+
+    def _evict(self, key: str):
+        if entry := self._entries.pop(key, None):
+            self._memory_bytes -= len(entry[2])
+
+    def _prune_versions(self):
+        """Drops the versions last bumped or stored more than `ttl` seconds ago"""
+
+        expired_before = time.monotonic() - self.ttl
+        while self._versions:
+            key, (touched_at, _) = next(iter(self._versions.items()))
+            if touched_at >= expired_before:
+                break
+            del self._versions[key]
+
+    async def version(self, key: str) -> int:
+        return self._versions.get(key, (0.0, 0))[1]
+
+    async def get(self, key: str, version: int) -> bytes | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        expires_at, entry_version, value = entry
+        if expires_at < time.monotonic() or entry_version != version:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, version: int, value: bytes):
+        if version != await self.version(key):
+            return
+        self._evict(key)
+        if key in self._versions:
+            self._versions[key] = (time.monotonic(), version)
+            self._versions.move_to_end(key)
+        self._entries[key] = (time.monotonic() + self.ttl, version, value)
+        self._memory_bytes += len(value)
+        while len(self._entries) > self.maxsize:
+            self._evict(next(iter(self._entries)))
+
+    async def invalidate(self, key: str):
+        self._versions[key] = (time.monotonic(), await self.version(key) + 1)
+        self._versions.move_to_end(key)
+        self._prune_versions()
+        self._evict(key)
+
+    def usage(self) -> dict:
+        self._prune_versions()
+        return {
+            "entries": len(self._entries),
+            "versions": len(self._versions),
+            "memory_bytes": self._memory_bytes,
+        }
+
+
+class LocalSharedStore:
+    """In-process stand-in of the shared store client, uses in tests and local runs"""
+
+    def __init__(self):
+        self._values: dict[str, tuple[float | None, bytes]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        expires_at, value = self._values.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            self._values.pop(key, None)
+            return None
+        return value
+
+    async def set(
+        self, key: str, value: bytes, ex: int | None = None, nx: bool = False
+    ) -> bool:
+        if nx and await self.get(key) is not None:
+            return False
+        expires_at = time.monotonic() + ex if ex else None
+        self._values[key] = (expires_at, value)
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        expires_at, _ = self._values.get(key, (None, None))
+        self._values[key] = (expires_at, str(value).encode())
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if (value := await self.get(key)) is None:
+            return False
+        self._values[key] = (time.monotonic() + seconds, value)
+        return True
+
+
+class SharedBackend(ProfileCacheBackend):
+    """
+    Store shared by every worker (Redis or the local stand-in),
+    so an invalidation on one worker is seen by the others.
+    Profiles are stored set-if-absent under `<user id>:<version>` and invalidation
+    increments the version, the entries of the previous versions expire by the ttl.
+    Every increment and every stored entry push the expiry of the version key
+    `ttl` seconds ahead.
+    """
+
+    def __init__(self, client, ttl: int, prefix: str = "profile:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def version(self, key: str) -> int:
+        return int(await self.client.get(f"{self.prefix}{key}:version") or 0)
+
+    async def get(self, key: str, version: int) -> bytes | None:
+        return await self.client.get(f"{self.prefix}{key}:{version}")
+
+    async def set(self, key: str, version: int, value: bytes):
+        await self.client.set(
+            f"{self.prefix}{key}:{version}", value, ex=self.ttl, nx=True
+        )
+        await self.client.expire(f"{self.prefix}{key}:version", self.ttl)
+
+    async def invalidate(self, key: str):
+        version_key = f"{self.prefix}{key}:version"
+        await self.client.incr(version_key)
+        await self.client.expire(version_key, self.ttl)
+
+
+class ProfileCache:
+    """
+    Cache of the already serialized `GET /profile` responses per user id.
+    Writers invalidate the entry after their commit, so the next read serializes again.
+    A reader stores the profile with the version it looked up before the database read,
+    so a profile loaded before a concurrent invalidation is dropped.
+    """
+
+    def __init__(self, backend: ProfileCacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def lookup(self, user_id: int) -> tuple[bytes | None, int]:
+        """Returns the cached profile and the version to store a fresh one with"""
+
+        if not self.enabled:
+            return None, 0
+        key = str(user_id)
+        version = await self.backend.version(key)
+        if (content := await self.backend.get(key, version)) is None:
+            self.misses += 1
+            return None, version
+        self.hits += 1
+        return content, version
+
+    async def set(self, user_id: int, content: bytes, version: int):
+        if self.enabled:
+            await self.backend.set(str(user_id), version, content)
+
+    async def invalidate(self, user_id: int):
+        if self.enabled:
+            await self.backend.invalidate(str(user_id))
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            **self.backend.usage(),
+        }
+
+
+def _backend() -> ProfileCacheBackend:
+    cache_settings = settings.cache
+    if cache_settings.profile_cache_backend == "shared":
+        if redis is None:
+            raise RuntimeError("The shared profile cache backend requires `redis`")
+        return SharedBackend(
+            redis.from_url(cache_settings.shared_cache_url),
+            ttl=cache_settings.profile_cache_ttl,
+        )
+    return MemoryBackend(
+        maxsize=cache_settings.profile_cache_size,
+        ttl=cache_settings.profile_cache_ttl,
+    )
+
+
+profile_cache = ProfileCache(
+    backend=_backend(),
+    enabled=settings.cache.profile_cache_backend != "disabled",
+)
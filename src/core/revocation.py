@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import time
+import uuid
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.configs import settings
+from src.core.jwt_cache import verified_token_cache
+from src.models import Token
+
+
+class RevocationIndex:
+    """
+    In-process index of revoked access tokens keyed by the `jti` claim.
+    Local logout and refresh events are applied immediately,
+    events of the other workers are picked up from the token table
+    at most `staleness_bound` seconds later.
+    """
+
+    def __init__(self, staleness_bound: int):
+        self.staleness_bound = staleness_bound
+        self._revoked: dict[uuid.UUID, datetime.datetime] = {}  # jti -> access expiry
+        self._synced_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def revoke(self, jti: uuid.UUID, expires_at: datetime.datetime):
+        """Marks the token id as revoked until the access token expires by itself"""
+        self._revoked[jti] = expires_at
+        verified_token_cache.invalidate(jti)
+
+    @staticmethod
+    def access_expires_at(created_at: datetime.datetime) -> datetime.datetime:
+        """
+        Expiration time of the access token of a pair, `Token.expires_at` is
+        the refresh token one. The pair is stored after the access token is signed,
+        so this is never earlier than its `exp` claim.
+        """
+        return created_at + datetime.timedelta(
+            minutes=settings.auth.access_token_lifetime
+        )
+
+    def revoke_token(self, token: Token | Row):
+        """Marks the access token of the stored token pair (or its row) as revoked"""
+        self.revoke(token.access_jti, self.access_expires_at(token.created_at))
+
+    def is_revoked(self, jti: uuid.UUID) -> bool:
+        return jti in self._revoked
+
+    def is_stale(self) -> bool:
+        return (
+            self._synced_at is None
+            or time.monotonic() - self._synced_at > self.staleness_bound
+        )
+
+    def _prune(self):
+        """Expired tokens are rejected by the `exp` claim, no need to keep them"""
+        now = datetime.datetime.utcnow()
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+
+    async def sync(self, session: AsyncSession):
+        """Loads revoked tokens which are not expired yet from the token table"""
+
+        now = datetime.datetime.utcnow()
+        stmt = select(Token.access_jti, Token.created_at).where(
+            Token.expired.is_(True),
+            Token.expires_at > now,
+            Token.created_at
+            > now - datetime.timedelta(minutes=settings.auth.access_token_lifetime),
+        )
+        result = await session.execute(stmt)
+        for token in result:
+            self.revoke_token(token)
+
+        self._prune()
+        self._synced_at = time.monotonic()
+
+    async def ensure_fresh(self, session: AsyncSession):
+        """Syncs the index if it is older than the staleness bound"""
+
+        if not self.is_stale():
+            return
+        async with self._lock:
+            if self.is_stale():
+                await self.sync(session)
+
+
+revocation_index = RevocationIndex(staleness_bound=settings.auth.revocation_staleness)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    """
+    Transaction scope of one request on the request session.
+    Repositories only flush, the unit of work commits once when the block is left
+    and rolls back if the block fails. Errors listed in `commit_on` are the outcome
+    of the writes (e.g. a counted failed attempt), they are raised after the commit.
+    The scope is entered by the service methods rather than around `get_session`,
+    so the cache invalidation and the token revocation run after the commit, and the
+    reads preceding a password hash end in their own scope, releasing the connection
+    instead of holding it idle in transaction while bcrypt runs.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        commit_on: tuple[Exception | type[Exception], ...] = (),
+    ):
+        self.session = session
+        self.commit_on = commit_on
+
+    def _is_committed_error(self, error: BaseException) -> bool:
+        return any(
+            error is expected
+            or (isinstance(expected, type) and isinstance(error, expected))
+            for expected in self.commit_on
+        )
+
+    async def __aenter__(self) -> UnitOfWork:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc is None or self._is_committed_error(exc):
+            await self.session.commit()
+        else:
+            await self.session.rollback()
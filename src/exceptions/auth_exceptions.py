@@ -46,6 +46,11 @@ TokenExpired = HTTPException(
 )
 
 
+OTPExpired = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN, detail=messages.OTP_CODE_IS_EXPIRED
+)
+
+
 # class based exceptions
 
 
@@ -1,6 +1,14 @@
 from fastapi import HTTPException, status
 
-from src.messages import FILE_SIZE, INVALID_CONTENT_TYPE, OBJECT_DOES_NOT_EXISTS
+from src.messages import (
+    DUPLICATED_OBJECT_IDS,
+    FILE_SIZE,
+    INVALID_CONTENT_TYPE,
+    INVALID_CURSOR,
+    OBJECT_DOES_NOT_EXISTS,
+    OBJECTS_DO_NOT_EXISTS,
+    SERVICE_IS_BUSY,
+)
 
 
 class FileIsTooLarge(HTTPException):
@@ -21,3 +29,31 @@ class ObjectDoesNotExists(HTTPException):
     def __init__(self):
         self.status_code = status.HTTP_404_NOT_FOUND
         self.detail = OBJECT_DOES_NOT_EXISTS
+
+
+class ObjectsDoNotExists(HTTPException):
+    def __init__(self, model: str, ids: list[int]):
+        self.status_code = status.HTTP_404_NOT_FOUND
+        self.detail = OBJECTS_DO_NOT_EXISTS.format(
+            model=model, ids=", ".join(map(str, ids))
+        )
+
+
+class DuplicatedObjectIds(HTTPException):
+    def __init__(self, model: str, ids: list[int]):
+        self.status_code = status.HTTP_400_BAD_REQUEST
+        self.detail = DUPLICATED_OBJECT_IDS.format(
+            model=model, ids=", ".join(map(str, ids))
+        )
+
+
+class ServiceIsBusy(HTTPException):
+    def __init__(self):
+        self.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        self.detail = SERVICE_IS_BUSY
+
+
+class InvalidCursor(HTTPException):
+    def __init__(self):
+        self.status_code = status.HTTP_400_BAD_REQUEST
+        self.detail = INVALID_CURSOR
@@ -23,8 +23,17 @@ PASSWORD_RESET_MESSAGE = (
 PASSWORDS_DID_NOT_MATCH = "The passwords did not match."
 PERMISSION_DENIED = "You dont have a permission to perform this action."
 TOKEN_IS_EXPIRED = "Token is expired."
+OTP_CODE_IS_EXPIRED = "OTP code is expired, please request a new one."
 FILE_SIZE = "File size is too large, for this action supports up to {filesize} mb"
 INVALID_CONTENT_TYPE = (
     "Invalid content type. For this case we support only `{content_types}` type(s)"
 )
 OBJECT_DOES_NOT_EXISTS = "Object does not exists"
+OBJECTS_DO_NOT_EXISTS = "Objects of `{model}` with ids {ids} do not exist."
+DUPLICATED_OBJECT_IDS = (
+    "Objects of `{model}` with ids {ids} are submitted more than once."
+)
+USER_GROUP_DOES_NOT_EXISTS = "User group does not exists."
+INVALID_RECORD = "The line is not a valid {data_format} record."
+SERVICE_IS_BUSY = "The service is busy right now, please try again later."
+INVALID_CURSOR = "The page cursor is not valid."
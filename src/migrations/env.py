@@ -8,8 +8,15 @@ from src.core.configs import settings, BASE_DIR
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from src.core.constants import MAIN_OPERATIONS, JsonType, ALLOW_ACTION, DENY_ACTION
+from src.core.constants import (
+    MAIN_OPERATIONS,
+    JsonType,
+    ALLOW_ACTION,
+    DENY_ACTION,
+    ADMIN_GROUP_ID,
+)
 from src.core.database import BaseModel, async_session
+from src.core.unit_of_work import UnitOfWork
 from alembic import context
 from src.models import *
 from src.repositories import user_group_repository
@@ -80,7 +87,9 @@ def _policies_generator(tables: list, policies: JsonType, group_id: int) -> Json
     polices = json.loads(policies)
     for action_key in key_list:
         if not polices.get(action_key):
-            polices[action_key] = ALLOW_ACTION if group_id == 4 else DENY_ACTION
+            polices[action_key] = (
+                ALLOW_ACTION if group_id == ADMIN_GROUP_ID else DENY_ACTION
+            )
 
     return json.dumps(polices)
 
@@ -94,7 +103,8 @@ async def set_user_groups() -> None:
                 if not await user_group_repository.check_group(
                     session=session, filter_kwargs={"id": group["id"]}
                 ):
-                    await user_group_repository.create(session=session, data=group)
+                    async with UnitOfWork(session):
+                        await user_group_repository.create(session=session, data=group)
                 await create_permissions(user_group_id=group["id"])
 
 
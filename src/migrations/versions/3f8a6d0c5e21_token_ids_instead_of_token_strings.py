@@ -0,0 +1,129 @@
+"""token ids instead of token strings
+
+Revision ID: 3f8a6d0c5e21
+Revises: 9c1e4b7d2a35
+Create Date: 2026-10-16 11:40:02.513377
+
+"""
+import datetime
+import uuid
+
+import jwt
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a6d0c5e21'
+down_revision = '9c1e4b7d2a35'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _claims(token: str | None) -> dict:
+    """Stored tokens were issued by us, so there is no need to verify them again"""
+    if not token:
+        return {}
+    try:
+        return jwt.decode(token, options={"verify_signature": False})
+    except jwt.exceptions.DecodeError:
+        return {}
+
+
+def _user_id(claims: dict) -> int | None:
+    """Same format as `src.utils.auth_helpers.decode_user_id`"""
+    parts = claims.get("sub", "").split("_")
+    return int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else None
+
+
+def _jti(claims: dict) -> uuid.UUID:
+    """Tokens issued before the `jti` claim get a random id, they can't be looked up anymore"""
+    try:
+        return uuid.UUID(hex=claims["jti"])
+    except (KeyError, TypeError, ValueError):
+        return uuid.uuid4()
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    select_stmt = sa.text(
+        "SELECT id, access_token, refresh_token FROM token "
+        "WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_stmt = sa.text(
+        "UPDATE token SET user_id = :user_id, access_jti = :access_jti, "
+        "refresh_jti = :refresh_jti, expires_at = :expires_at WHERE id = :id"
+    )
+    delete_stmt = sa.text("DELETE FROM token WHERE id = :id")
+
+    last_id = 0
+    while rows := bind.execute(
+        select_stmt, {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+    ).all():
+        updates, orphans = [], []
+        for token_id, access_token, refresh_token in rows:
+            access_claims, refresh_claims = _claims(access_token), _claims(refresh_token)
+            user_id = _user_id(refresh_claims) or _user_id(access_claims)
+            if user_id is None:
+                orphans.append({"id": token_id})
+                continue
+            updates.append(
+                {
+                    "id": token_id,
+                    "user_id": user_id,
+                    "access_jti": _jti(access_claims),
+                    "refresh_jti": _jti(refresh_claims),
+                    "expires_at": datetime.datetime.utcfromtimestamp(
+                        refresh_claims.get("exp", 0)
+                    ),
+                }
+            )
+        if updates:
+            bind.execute(update_stmt, updates)
+        if orphans:
+            bind.execute(delete_stmt, orphans)
+        last_id = rows[-1][0]
+
+    # tokens of deleted users
+    op.execute(
+        'DELETE FROM token WHERE NOT EXISTS '
+        '(SELECT 1 FROM "user" WHERE "user".id = token.user_id)'
+    )
+
+
+def upgrade() -> None:
+    op.add_column('token', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.add_column('token', sa.Column('access_jti', sa.Uuid(), nullable=True))
+    op.add_column('token', sa.Column('refresh_jti', sa.Uuid(), nullable=True))
+    op.add_column('token', sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    _backfill()
+
+    op.alter_column('token', 'user_id', nullable=False)
+    op.alter_column('token', 'access_jti', nullable=False)
+    op.alter_column('token', 'refresh_jti', nullable=False)
+    op.alter_column('token', 'expires_at', nullable=False)
+    op.create_index(op.f('ix_token_user_id'), 'token', ['user_id'], unique=False)
+    op.create_unique_constraint(op.f('uq_token_access_jti'), 'token', ['access_jti'])
+    op.create_unique_constraint(op.f('uq_token_refresh_jti'), 'token', ['refresh_jti'])
+    op.create_foreign_key(op.f('fk_token_user_id_user'), 'token', 'user', ['user_id'], ['id'], ondelete='CASCADE')
+    op.drop_column('token', 'access_token')
+    op.drop_column('token', 'refresh_token')
+
+
+def downgrade() -> None:
+    # the token strings can't be restored, every token pair has to be issued again
+    op.add_column('token', sa.Column('access_token', sa.VARCHAR(), autoincrement=False, nullable=True))
+    op.add_column('token', sa.Column('refresh_token', sa.VARCHAR(), autoincrement=False, nullable=True))
+    op.execute("UPDATE token SET expired = true")
+    op.drop_constraint(op.f('fk_token_user_id_user'), 'token', type_='foreignkey')
+    op.drop_constraint(op.f('uq_token_refresh_jti'), 'token', type_='unique')
+    op.drop_constraint(op.f('uq_token_access_jti'), 'token', type_='unique')
+    op.drop_index(op.f('ix_token_user_id'), table_name='token')
+    op.drop_column('token', 'expires_at')
+    op.drop_column('token', 'refresh_jti')
+    op.drop_column('token', 'access_jti')
+    op.drop_column('token', 'user_id')
@@ -0,0 +1,69 @@
+"""case insensitive user email
+
+Revision ID: a9d3e7f2c1b8
+Revises: f1c5a9e3b7d4
+Create Date: 2026-10-16 21:14:52.306718
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e7f2c1b8'
+down_revision = 'f1c5a9e3b7d4'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+    collisions = op.get_bind().execute(
+        sa.text(
+            'SELECT lower(btrim(email)) AS email, array_agg(id ORDER BY id) AS ids, '
+            'array_agg(email ORDER BY id) AS emails '
+            'FROM "user" GROUP BY lower(btrim(email)) HAVING count(*) > 1'
+        )
+    ).all()
+    if collisions:
+        for collision in collisions:
+            logger.error(
+                'Email %s is taken by users %s (%s)',
+                collision.email,
+                ', '.join(map(str, collision.ids)),
+                ', '.join(collision.emails),
+            )
+        raise RuntimeError(
+            f'{len(collisions)} emails differ only by case or surrounding spaces, '
+            f'merge or rename the reported users and run the migration again'
+        )
+
+    # the same normalization as `normalize_email`, so the stored emails match lookups
+    op.execute(
+        'UPDATE "user" SET email = lower(btrim(email)) '
+        'WHERE email <> lower(btrim(email))'
+    )
+
+    with op.get_context().autocommit_block():
+        # a failed concurrent build leaves an invalid index behind
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS uq_user_lower_email')
+        op.create_index(
+            'uq_user_lower_email',
+            'user',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint(op.f('uq_user_email'), 'user', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint(op.f('uq_user_email'), 'user', ['email'])
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_user_lower_email', table_name='user', postgresql_concurrently=True
+        )
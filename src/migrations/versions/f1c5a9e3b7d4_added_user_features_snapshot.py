@@ -0,0 +1,29 @@
+"""added user features snapshot
+
+Revision ID: f1c5a9e3b7d4
+Revises: e8b4c2d6f0a3
+Create Date: 2026-10-16 19:08:27.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c5a9e3b7d4'
+down_revision = 'e8b4c2d6f0a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing users stay NULL (read from the features tables) until
+    # `python manage.py rebuild-snapshots`, only new users default to an empty list.
+    op.add_column('user', sa.Column('features_snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.alter_column('user', 'features_snapshot', server_default=sa.text("'[]'::jsonb"))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'features_snapshot')
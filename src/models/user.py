@@ -1,20 +1,27 @@
 import datetime
+import uuid
 from typing import Annotated, Optional
 
 from annotated_types import MinLen
 from pydantic import EmailStr
 from sqlalchemy import (
+    DDL,
     String,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     UniqueConstraint,
+    Uuid,
+    event,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, validates, relationship
 
 from src.core.database import BaseModel
+from src.utils.base_helpers import normalize_email
 
 
 class UserGroup(BaseModel):
@@ -39,6 +46,20 @@ class Permission(BaseModel):
 
 class UserRelatedFeatureValue(BaseModel):
     __tablename__ = "userrelatedfeaturevalue"
+    __table_args__ = (
+        Index(
+            "ix_userrelatedfeaturevalue_feature_id_value",
+            "feature_id",
+            "value",
+            postgresql_ops={"value": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_userrelatedfeaturevalue_value_trgm",
+            "value",
+            postgresql_using="gin",
+            postgresql_ops={"value": "gin_trgm_ops"},
+        ),
+    )
 
     value: Mapped[str] = mapped_column(String(200))
     feature: Mapped["UserRelatedFeatures"] = relationship(
@@ -48,8 +69,16 @@ class UserRelatedFeatureValue(BaseModel):
     UniqueConstraint("value", "feature_id", name="uix_1")
 
 
+event.listen(
+    UserRelatedFeatureValue.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
+
 class UserRelatedFeatures(BaseModel):
     __tablename__ = "user_features"
+    __table_args__ = (Index("ix_user_features_title_user_id", "title", "user_id"),)
 
     title: Mapped[str] = mapped_column(String(30))
     values: Mapped[Optional[list["UserRelatedFeatureValue"]]] = relationship(
@@ -63,6 +92,12 @@ class UserRelatedFeatures(BaseModel):
 
 class User(BaseModel):
     __tablename__ = "user"
+    __table_args__ = (
+        Index("uq_user_lower_email", text("lower(email)"), unique=True),
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index("ix_user_group_id_created_at_id", "group_id", "created_at", "id"),
+        Index("ix_user_is_active_created_at_id", "is_active", "created_at", "id"),
+    )
 
     group_id: Mapped[int] = mapped_column(Integer, ForeignKey("usergroup.id"))
     group: Mapped["UserGroup"] = relationship(
@@ -75,20 +110,32 @@ class User(BaseModel):
     first_name: Mapped[Annotated[str, MinLen(3)]] = mapped_column(String(20))
     last_name: Mapped[Annotated[str, MinLen(3)]] = mapped_column(String(20))
     photo: Mapped[str] = mapped_column(nullable=True)
-    email: Mapped[Annotated[str, EmailStr]] = mapped_column(unique=True)
+    email: Mapped[Annotated[str, EmailStr]] = mapped_column()
     password: Mapped[Optional[bytes]]
     otp_code: Mapped[Optional[str]]
+    otp_purpose: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    otp_expires_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=False),
+        nullable=True,
+    )
     last_login: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=False),
         nullable=True,
     )
     is_active: Mapped[bool] = mapped_column(default=False, nullable=True)
     attempts_count: Mapped[int] = mapped_column(nullable=True)
+    features_snapshot: Mapped[Optional[list]] = mapped_column(
+        JSONB, nullable=True, server_default=text("'[]'::jsonb")
+    )
 
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    @validates("email")
+    def validate_email(self, _, value):
+        return normalize_email(value)
+
     @validates("attempts_count")
     def validate_attempts_count(self, _, value):
         if value and (value < 0 or value > 3):
@@ -97,8 +144,24 @@ class User(BaseModel):
 
 
 class Token(BaseModel):
+    """
+    Ids of an issued token pair.
+    `manage.py partition-tokens` converts the table into one range partitioned by
+    `created_at`, its keys must contain the partition key there: the primary key
+    becomes (id, created_at) and the jti unique keys (access_jti, created_at) and
+    (refresh_jti, created_at). The metadata below describes the plain table,
+    don't autogenerate token migrations against a partitioned database.
+    Global jti uniqueness is checked by the refresh rotation instead.
+    """
+
     __tablename__ = "token"
 
-    refresh_token: Mapped[Optional[str]] = mapped_column(default=None, nullable=True)
-    access_token: Mapped[Optional[str]] = mapped_column(default=None, nullable=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("user.id", ondelete="CASCADE"), index=True
+    )
+    access_jti: Mapped[uuid.UUID] = mapped_column(Uuid, unique=True)
+    refresh_jti: Mapped[uuid.UUID] = mapped_column(Uuid, unique=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=False), index=True
+    )
     expired: Mapped[bool] = mapped_column(default=False)
@@ -1,5 +1,11 @@
 from ._user_repository import UserRepository as user_repository
 from ._token_repository import TokenRepository as token_repository
 from ._user_group_repository import UserGroupRepository as user_group_repository
+from ._metadata import build_metadata_registry
 
-__all__ = ["user_repository", "user_group_repository", "token_repository"]
+__all__ = [
+    "user_repository",
+    "user_group_repository",
+    "token_repository",
+    "build_metadata_registry",
+]
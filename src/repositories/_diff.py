@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from src.exceptions.base_exceptions import DuplicatedObjectIds, ObjectsDoNotExists
+
+if TYPE_CHECKING:
+    from src.core.constants import DbBaseModel
+
+
+@dataclass
+class RowsDiff:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+def changed_fields(columns: frozenset[str], payload: dict, current: Any) -> dict:
+    """Returns the payload columns whose values differ from the current object"""
+
+    return {
+        key: value
+        for key, value in payload.items()
+        if key in columns and key != "id" and getattr(current, key) != value
+    }
+
+
+def match_children(
+    model: DbBaseModel,
+    columns: frozenset[str],
+    payloads: list[dict],
+    current: list,
+) -> tuple[list[tuple[dict, Any | None]], list[int]]:
+    """
+    Pairs the submitted items with the current objects and returns the pairs
+    and the ids of the current objects which were not submitted anymore.
+    Items are matched by `id`, the items without `id` by equal column values,
+    the unknown ids and the ids submitted more than once are reported at once.
+    """
+
+    current_by_id = {obj.id: obj for obj in current}
+    id_counts = Counter(item["id"] for item in payloads if item.get("id") is not None)
+    if duplicated_ids := sorted(
+        obj_id for obj_id, count in id_counts.items() if count > 1
+    ):
+        raise DuplicatedObjectIds(model.__name__, duplicated_ids)
+    submitted_ids = set(id_counts)
+    if missing_ids := sorted(submitted_ids - set(current_by_id)):
+        raise ObjectsDoNotExists(model.__name__, missing_ids)
+
+    unmatched = {
+        obj_id: obj
+        for obj_id, obj in current_by_id.items()
+        if obj_id not in submitted_ids
+    }
+    pairs = []
+    for item in payloads:
+        if item.get("id") is not None:
+            pairs.append((item, current_by_id[item["id"]]))
+            continue
+        same_obj_id = next(
+            (
+                obj_id
+                for obj_id, obj in unmatched.items()
+                if not changed_fields(columns, item, obj)
+            ),
+            None,
+        )
+        pairs.append((item, unmatched.pop(same_obj_id, None)))
+    return pairs, list(unmatched)
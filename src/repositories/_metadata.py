@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipDirection, RelationshipProperty
+
+from src.core.database import Base
+
+if TYPE_CHECKING:
+    from src.core.constants import DbBaseModel
+
+
+@dataclass(frozen=True)
+class RelationMetadata:
+    key: str
+    model: DbBaseModel
+    back_populates: str | None
+    is_one_to_many: bool
+    is_one_to_one: bool
+    # foreign key attribute of the related model which refers to the parent,
+    # set for the child (one-to-many and one-to-one) relations only
+    parent_column: str | None = None
+
+
+def _parent_column(relationship: RelationshipProperty) -> str | None:
+    """Returns the attribute of the related model's FK column, taken from the join"""
+
+    if relationship.direction != RelationshipDirection.ONETOMANY:
+        return None
+    (_, remote_column), *_ = relationship.local_remote_pairs
+    return relationship.mapper.get_property_by_column(remote_column).key
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    model: DbBaseModel
+    columns: frozenset[str]
+    relations: tuple[RelationMetadata, ...]
+    child_relations: tuple[RelationMetadata, ...]
+
+
+_registry: dict[DbBaseModel, ModelMetadata] = {}
+
+
+def _build_model_metadata(model: DbBaseModel) -> ModelMetadata:
+    mapper = inspect(model)
+    relations = tuple(
+        RelationMetadata(
+            key=relationship.key,
+            model=relationship.mapper.entity,
+            back_populates=relationship.back_populates,
+            is_one_to_many=relationship.direction == RelationshipDirection.ONETOMANY
+            and relationship.uselist is not False,
+            is_one_to_one=relationship.direction == RelationshipDirection.ONETOMANY
+            and relationship.uselist is False,
+            parent_column=_parent_column(relationship),
+        )
+        for relationship in mapper.relationships
+    )
+    return ModelMetadata(
+        model=model,
+        columns=frozenset(column.key for column in mapper.columns),
+        relations=relations,
+        child_relations=tuple(
+            relation
+            for relation in relations
+            if relation.is_one_to_many or relation.is_one_to_one
+        ),
+    )
+
+
+def get_model_metadata(model: DbBaseModel) -> ModelMetadata:
+    """Returns the cached mapper metadata of the model"""
+
+    if (metadata := _registry.get(model)) is None:
+        metadata = _registry[model] = _build_model_metadata(model)
+    return metadata
+
+
+def build_metadata_registry():
+    """Computes the metadata of every mapped model, uses once at startup"""
+
+    for mapper in Base.registry.mappers:
+        get_model_metadata(mapper.class_)
@@ -1,15 +1,69 @@
 from __future__ import annotations
+
+import datetime
+import uuid
 from typing import TYPE_CHECKING
-from sqlalchemy import select, update
+from sqlalchemy import (
+    Uuid,
+    DateTime,
+    String,
+    and_,
+    delete,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects import postgresql
 
+from src.core.configs import settings
 from src.exceptions.auth_exceptions import UnAuthorized
 from src.models import Token
-from src.utils.auth_helpers import decode_user_id, create_refresh_and_access_tokens
+from src.utils.auth_helpers import (
+    decode_user_id,
+    decode_token_id,
+    create_refresh_and_access_tokens,
+)
+
+
+PARTITION_NAME_PREFIX = "token_p"
+DEFAULT_PARTITION_NAME = "token_default"
+
+
+def _month_start(moment: datetime.datetime, months: int = 0) -> datetime.datetime:
+    """Returns the first moment of the month shifted by `months`"""
+    month_index = moment.year * 12 + moment.month - 1 + months
+    return datetime.datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_name(month_start: datetime.datetime) -> str:
+    return f"{PARTITION_NAME_PREFIX}{month_start:%Y_%m}"
+
+
+_dialect = postgresql.dialect()
+
+
+def _identifier(name: str) -> str:
+    """Returns the table name quoted for the DDL"""
+    return _dialect.identifier_preparer.quote(name)
+
+
+def _bound(moment: datetime.datetime) -> str:
+    """Returns the partition bound rendered as a literal, DDL takes no parameters"""
+    return str(
+        literal(moment.isoformat(), String).compile(
+            dialect=_dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
 
 
 if TYPE_CHECKING:
+    from sqlalchemy import Row
     from sqlalchemy.ext.asyncio import AsyncSession
-    from src.schemas.auth import RefreshTokenScheme, TokenResponseScheme
+    from src.schemas.auth import TokenResponseScheme
 
 
 class TokenRepository:
@@ -40,33 +94,294 @@ class TokenRepository:
 
         await session.scalars(stmt)
 
+    @staticmethod
+    def _expires_at() -> datetime.datetime:
+        """Returns the expiration time of a new token pair"""
+        return datetime.datetime.utcnow() + datetime.timedelta(
+            days=settings.auth.refresh_token_lifetime
+        )
+
     @classmethod
     async def tokenize(cls, session: AsyncSession, user_id: int) -> TokenResponseScheme:
         """Creates refresh and access tokens for the particular user"""
 
-        token_data = create_refresh_and_access_tokens(user_id=user_id)
+        access_jti, refresh_jti = uuid.uuid4(), uuid.uuid4()
+        token_data = create_refresh_and_access_tokens(
+            user_id=user_id, access_jti=access_jti, refresh_jti=refresh_jti
+        )
 
         stmt = Token(
-            refresh_token=token_data.refresh_token, access_token=token_data.access_token
+            user_id=user_id,
+            access_jti=access_jti,
+            refresh_jti=refresh_jti,
+            expires_at=cls._expires_at(),
         )
         session.add(stmt)
-        await session.commit()
+        await session.flush()
         return token_data
 
     @classmethod
     async def refresh_token(
-        cls, session: AsyncSession, payload: RefreshTokenScheme, token_data: dict
-    ):
-        """Refreshes and returns a couple of refresh and access tokens"""
+        cls, session: AsyncSession, token_data: dict
+    ) -> tuple[TokenResponseScheme, Row]:
+        """
+        Rotates the token pair and returns a new couple of refresh and access tokens
+        with the (access_jti, created_at) of the old pair to revoke after the commit.
+        The old pair is marked expired only if it is still live and the new pair is inserted
+        by the same statement, so two concurrent refreshes of one token can't both succeed.
+        The unique keys of the partitioned table hold per `created_at` only, so the rotation
+        also requires the presented jti to match one pair and the new jtis to match none.
+        `created_at` is taken from the app clock like the ORM default of `tokenize`,
+        the revocation index compares it with `utcnow()` of the app.
+        """
+
+        refresh_jti = decode_token_id(token_data)
+        user_id: int = decode_user_id(token_data["sub"])
+        access_jti, new_refresh_jti = uuid.uuid4(), uuid.uuid4()
+        new_token_data = create_refresh_and_access_tokens(
+            user_id=user_id, access_jti=access_jti, refresh_jti=new_refresh_jti
+        )
+        created_at = datetime.datetime.utcnow()
 
-        await cls.check_token_validity(
-            session=session, refresh_token=payload.refresh_token, expired=False
+        rotated = (
+            update(cls.model)
+            .where(
+                cls.model.refresh_jti == refresh_jti,
+                cls.model.user_id == user_id,
+                cls.model.expired.is_(False),
+                cls.model.expires_at > datetime.datetime.utcnow(),
+            )
+            .values(expired=True)
+            .returning(cls.model.user_id, cls.model.access_jti, cls.model.created_at)
+            .cte("rotated")
         )
-        token = await cls.check_token_validity(
-            session=session, refresh_token=payload.refresh_token, expired=False
+        inserted = (
+            insert(cls.model)
+            .from_select(
+                ["user_id", "access_jti", "refresh_jti", "created_at", "expires_at"],
+                select(
+                    rotated.c.user_id,
+                    literal(access_jti, Uuid),
+                    literal(new_refresh_jti, Uuid),
+                    literal(created_at, DateTime),
+                    literal(cls._expires_at(), DateTime),
+                ).where(
+                    ~select(cls.model.id)
+                    .where(
+                        or_(
+                            cls.model.access_jti.in_([access_jti, new_refresh_jti]),
+                            cls.model.refresh_jti.in_([access_jti, new_refresh_jti]),
+                        )
+                    )
+                    .exists()
+                ),
+            )
+            .returning(cls.model.id)
+            .cte("inserted")
         )
-        await cls.update_token(session=session, expired=True, token_id=token.id)
-        user_id: int = decode_user_id(token_data["sub"])
-        token_data = await cls.tokenize(session=session, user_id=user_id)
-        await session.commit()
-        return token_data
+        stmt = select(rotated.c.access_jti, rotated.c.created_at).join_from(
+            rotated, inserted, true()
+        )
+
+        result = (await session.execute(stmt)).all()
+        if len(result) != 1:
+            raise UnAuthorized
+
+        return new_token_data, result[0]
+
+    @classmethod
+    async def purge_expired(cls, session: AsyncSession, batch_size: int) -> int:
+        """
+        Deletes one batch of dead token pairs and returns the number of deleted rows.
+        Revoked pairs are kept while their access token may still be presented,
+        the revocation index of the other workers is synced from them.
+        """
+
+        now = datetime.datetime.utcnow()
+        revoked_before = now - datetime.timedelta(
+            minutes=settings.auth.access_token_lifetime
+        )
+        purgeable = (
+            select(cls.model.id)
+            .where(
+                or_(
+                    cls.model.expires_at <= now,
+                    and_(
+                        cls.model.expired.is_(True),
+                        cls.model.created_at <= revoked_before,
+                    ),
+                )
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(cls.model)
+            .where(cls.model.id.in_(purgeable))
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    @classmethod
+    async def is_partitioned(cls, session: AsyncSession) -> bool:
+        """Returns whether the token table is range partitioned"""
+
+        stmt = text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = CAST(:table_name AS regclass))"
+        )
+        return bool(
+            await session.scalar(stmt, {"table_name": cls.model.__tablename__})
+        )
+
+    @classmethod
+    async def get_partitions(cls, session: AsyncSession) -> list[str]:
+        """Returns the partition names of the token table"""
+
+        stmt = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table_name AS regclass) "
+            "ORDER BY child.relname"
+        )
+        result = await session.scalars(stmt, {"table_name": cls.model.__tablename__})
+        return list(result)
+
+    @classmethod
+    async def create_partitions(cls, session: AsyncSession, months_ahead: int):
+        """
+        Creates the DEFAULT partition and the monthly partitions from the current month
+        up to `months_ahead`. Rows written to the DEFAULT partition while their month
+        had no partition yet are moved to the new monthly partition, the token table
+        is locked against writes until the transaction ends, so no row lands in the
+        DEFAULT partition between the move and the attachment.
+        """
+
+        table_name = _identifier(cls.model.__tablename__)
+        default_partition = _identifier(DEFAULT_PARTITION_NAME)
+        await session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {default_partition} "
+                f"PARTITION OF {table_name} DEFAULT"
+            )
+        )
+
+        partitions = set(await cls.get_partitions(session))
+        now = datetime.datetime.utcnow()
+        missing_months = [
+            month_start
+            for month_start in (
+                _month_start(now, months) for months in range(months_ahead + 1)
+            )
+            if _partition_name(month_start) not in partitions
+        ]
+        if not missing_months:
+            return
+
+        await session.execute(
+            text(f"LOCK TABLE {table_name} IN SHARE ROW EXCLUSIVE MODE")
+        )
+        for month_start in missing_months:
+            partition_name = _identifier(_partition_name(month_start))
+            month_end = _month_start(month_start, 1)
+            await session.execute(
+                text(
+                    f"CREATE TABLE {partition_name} "
+                    f"(LIKE {table_name} INCLUDING DEFAULTS)"
+                )
+            )
+            await session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default_partition} "
+                    f"WHERE created_at >= :month_start AND created_at < :month_end "
+                    f"RETURNING *) INSERT INTO {partition_name} SELECT * FROM moved"
+                ).bindparams(month_start=month_start, month_end=month_end)
+            )
+            await session.execute(
+                text(
+                    f"ALTER TABLE {table_name} ATTACH PARTITION {partition_name} "
+                    f"FOR VALUES FROM ({_bound(month_start)}) TO ({_bound(month_end)})"
+                )
+            )
+
+    @classmethod
+    async def drop_expired_partitions(cls, session: AsyncSession) -> int:
+        """
+        Drops the monthly partitions whose every token pair is already expired
+        and returns the number of dropped rows. The DEFAULT partition is kept,
+        its rows are purged one by one.
+        """
+
+        created_before = datetime.datetime.utcnow() - datetime.timedelta(
+            days=settings.auth.refresh_token_lifetime
+        )
+        dropped_rows = 0
+        for partition_name in await cls.get_partitions(session):
+            if partition_name == DEFAULT_PARTITION_NAME:
+                continue
+            month_start = datetime.datetime.strptime(
+                partition_name.removeprefix(PARTITION_NAME_PREFIX), "%Y_%m"
+            )
+            if _month_start(month_start, 1) > created_before:
+                continue
+
+            dropped_rows += await session.scalar(
+                text(f"SELECT count(*) FROM {_identifier(partition_name)}")
+            )
+            await session.execute(
+                text(f"DROP TABLE IF EXISTS {_identifier(partition_name)}")
+            )
+
+        return dropped_rows
+
+    @classmethod
+    async def partition_table(cls, session: AsyncSession, months_ahead: int):
+        """
+        Converts the token table into a table range partitioned by `created_at`.
+        Unique keys of a partitioned table must contain the partition key,
+        so the token ids are unique together with `created_at` there.
+        The DEFAULT partition takes the rows of the months without a partition yet.
+        """
+
+        table_name = cls.model.__tablename__
+        now = datetime.datetime.utcnow()
+        oldest = await session.scalar(text(f"SELECT min(created_at) FROM {table_name}"))
+
+        statements = [
+            f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE",
+            f"CREATE TABLE {table_name}_partitioned "
+            f"(LIKE {table_name} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)",
+            f"ALTER SEQUENCE {table_name}_id_seq OWNED BY {table_name}_partitioned.id",
+        ]
+        month_start = _month_start(oldest or now)
+        while month_start <= _month_start(now, months_ahead):
+            statements.append(
+                f"CREATE TABLE {_identifier(_partition_name(month_start))} "
+                f"PARTITION OF {table_name}_partitioned FOR VALUES "
+                f"FROM ({_bound(month_start)}) "
+                f"TO ({_bound(_month_start(month_start, 1))})"
+            )
+            month_start = _month_start(month_start, 1)
+        statements.append(
+            f"CREATE TABLE {DEFAULT_PARTITION_NAME} "
+            f"PARTITION OF {table_name}_partitioned DEFAULT"
+        )
+        statements += [
+            f"INSERT INTO {table_name}_partitioned SELECT * FROM {table_name}",
+            f"DROP TABLE {table_name}",
+            f"ALTER TABLE {table_name}_partitioned RENAME TO {table_name}",
+            f"ALTER TABLE {table_name} ADD CONSTRAINT pk_{table_name} "
+            f"PRIMARY KEY (id, created_at)",
+            f"ALTER TABLE {table_name} ADD CONSTRAINT uq_{table_name}_access_jti "
+            f"UNIQUE (access_jti, created_at)",
+            f"ALTER TABLE {table_name} ADD CONSTRAINT uq_{table_name}_refresh_jti "
+            f"UNIQUE (refresh_jti, created_at)",
+            f"ALTER TABLE {table_name} ADD CONSTRAINT fk_{table_name}_user_id_user "
+            f'FOREIGN KEY (user_id) REFERENCES "user" (id) ON DELETE CASCADE',
+            f"CREATE INDEX ix_{table_name}_user_id ON {table_name} (user_id)",
+            f"CREATE INDEX ix_{table_name}_expires_at ON {table_name} (expires_at)",
+        ]
+        for statement in statements:
+            await session.execute(text(statement))
@@ -21,6 +21,11 @@ class UserGroupRepository(BaseRepository):
 
         return bool(stmt.all())
 
+    @classmethod
+    async def get_ids(cls, session: AsyncSession) -> set[int]:
+        """Returns the ids of every user group"""
+        return set(await session.scalars(select(cls.model.id)))
+
     # @classmethod
     # async def crate_bulk(cls, session: AsyncSession, obj_list: Iterable):
     #     """Creates a bunch of instances"""
@@ -33,5 +38,5 @@ class UserGroupRepository(BaseRepository):
     async def create(cls, session: AsyncSession, data: dict) -> model:
         instance = cls.model(**data)
         session.add(instance)
-        await session.commit()
+        await session.flush()
         return instance
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import select
+from sqlalchemy import JSON, func, literal_column, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 
+from src.core.configs import settings
 from src.exceptions.auth_exceptions import (
     UserDoesNotFound,
     EmailDuplication,
@@ -13,15 +16,43 @@ from src.exceptions.auth_exceptions import (
     AccountAlreadyVerified,
     AccountDeleted,
     InvalidOTP,
+    OTPExpired,
 )
-from src.models import User, UserRelatedFeatures
+from src.models import User, UserGroup, UserRelatedFeatures, UserRelatedFeatureValue
 from src.schemas.auth import AccountVerificationScheme
 from src.repositories.initial import BaseRepository
-from src.utils.auth_helpers import generate_otp_code
+from src.core.constants import (
+    FeatureMatchModes,
+    OTPPurposes,
+    OTP_MAX_ATTEMPTS,
+    UserLoadProfiles,
+)
+from src.utils.otp_helpers import otp_generator
+from src.utils.base_helpers import normalize_email
 
 
 if TYPE_CHECKING:
+    from typing import Sequence
+    from sqlalchemy import ColumnElement, Row, ScalarSelect
     from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm.interfaces import ORMOption
+    from typing import AsyncIterator
+    from src.core.constants import DbBaseModel
+    from src.schemas.user import UserFilterSchema
+
+
+USER_IMPORT_COLUMNS = (
+    "group_id",
+    "first_name",
+    "last_name",
+    "email",
+    "password",
+    "otp_code",
+    "otp_purpose",
+    "otp_expires_at",
+    "is_active",
+    "attempts_count",
+)
 
 
 class UserRepository(BaseRepository):
@@ -44,17 +75,59 @@ class UserRepository(BaseRepository):
     #     return selector[relation_type]
 
     @classmethod
-    async def get_user(cls, session: AsyncSession, **kwargs) -> User:
-        """Returns a user instance"""
+    def _load_options(cls, profile: UserLoadProfiles) -> tuple[ORMOption, ...]:
+        """
+        Loader options of the profile.
+        `auth` selects only the credential and OTP columns, `summary` every user column
+        and `full` the group and the whole features tree as well.
+        Not loaded attributes raise instead of emitting lazy queries.
+        """
+
+        if profile is UserLoadProfiles.AUTH:
+            return (
+                load_only(
+                    cls.model.id,
+                    cls.model.email,
+                    cls.model.password,
+                    cls.model.is_active,
+                    cls.model.attempts_count,
+                    cls.model.otp_code,
+                    cls.model.otp_purpose,
+                    cls.model.otp_expires_at,
+                    raiseload=True,
+                ),
+                raiseload("*"),
+            )
+        if profile is UserLoadProfiles.SUMMARY:
+            return (raiseload("*"),)
+        return (
+            joinedload(cls.model.group),
+            selectinload(cls.model.features).selectinload(
+                UserRelatedFeatures.values,
+            ),
+        )
+
+    @classmethod
+    def email_is(cls, email: str) -> ColumnElement[bool]:
+        """Case-insensitive email criterion, matches the `lower(email)` unique index"""
+        return func.lower(cls.model.email) == normalize_email(email)
+
+    @classmethod
+    async def get_user(
+        cls,
+        session: AsyncSession,
+        profile: UserLoadProfiles = UserLoadProfiles.FULL,
+        **kwargs,
+    ) -> User:
+        """Returns a user instance loaded by the profile"""
+        criteria = []
+        if (email := kwargs.pop("email", None)) is not None:
+            criteria.append(cls.email_is(email))
         stmt = (
             select(cls.model)
+            .where(*criteria)
             .filter_by(**kwargs)
-            .options(
-                joinedload(cls.model.group),
-                selectinload(cls.model.features).selectinload(
-                    UserRelatedFeatures.values,
-                ),
-            )
+            .options(*cls._load_options(profile))
         )
 
         result = await session.scalars(stmt)
@@ -66,70 +139,506 @@ class UserRepository(BaseRepository):
 
     @classmethod
     async def create_user(cls, session: AsyncSession, user_data: dict):
-        """Creates a new user"""
+        """Creates a new user in a savepoint, so a duplicated email keeps the request"""
         try:
-            stmt = cls.model(**user_data)
-            session.add(stmt)
-            # TODO:Send email
-            await session.commit()
+            async with session.begin_nested():
+                session.add(cls.model(**user_data))
+                # TODO:Send email
         except IntegrityError as e:
-            await session.rollback()
             raise EmailDuplication
         except ValueError as e:
-            await session.rollback()
             raise InvalidData(f"{e}")
 
+    @classmethod
+    async def copy_users(cls, session: AsyncSession, records: list[tuple]) -> set[str]:
+        """
+        Loads `USER_IMPORT_COLUMNS` records by `COPY` into a temporary staging table
+        and moves them into the user table by one statement, in the current transaction.
+        Taken emails are skipped, returns the emails of the inserted users.
+        """
+
+        table_name = cls.model.__tablename__
+        columns = ", ".join(USER_IMPORT_COLUMNS)
+        await session.execute(
+            text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {table_name}_import "
+                f'ON COMMIT DELETE ROWS AS SELECT {columns} FROM "{table_name}" '
+                f"WITH NO DATA"
+            )
+        )
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            f"{table_name}_import", records=records, columns=USER_IMPORT_COLUMNS
+        )
+
+        result = await session.scalars(
+            text(
+                f'INSERT INTO "{table_name}" ({columns}) '
+                f"SELECT {columns} FROM {table_name}_import "
+                f"ON CONFLICT DO NOTHING RETURNING email"
+            )
+        )
+        return set(result)
+
+    @classmethod
+    def filter_criteria(cls, filters: UserFilterSchema) -> list:
+        """Returns the where criteria of the users filter"""
+
+        criteria = []
+        if filters.group_id is not None:
+            criteria.append(cls.model.group_id == filters.group_id)
+        if filters.is_active is not None:
+            criteria.append(cls.model.is_active.is_(filters.is_active))
+        if filters.created_from is not None:
+            criteria.append(cls.model.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            criteria.append(cls.model.created_at < filters.created_to)
+        if filters.last_login_from is not None:
+            criteria.append(cls.model.last_login >= filters.last_login_from)
+        if filters.last_login_to is not None:
+            criteria.append(cls.model.last_login < filters.last_login_to)
+        return criteria
+
+    @classmethod
+    async def list_users(
+        cls,
+        session: AsyncSession,
+        filters: UserFilterSchema,
+        limit: int,
+        after: tuple[datetime.datetime, int] | None = None,
+    ) -> list[Row]:
+        """
+        Returns up to `limit` newest users after the (created_at, id) keyset position.
+        The position is compared as a row value, so every page is an index range scan
+        of the (created_at, id) composite indexes whatever its depth is.
+        """
+
+        stmt = (
+            select(
+                cls.model.id,
+                cls.model.first_name,
+                cls.model.last_name,
+                cls.model.email,
+                cls.model.group_id,
+                cls.model.is_active,
+                cls.model.created_at,
+                cls.model.last_login,
+            )
+            .where(*cls.filter_criteria(filters))
+            .order_by(cls.model.created_at.desc(), cls.model.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(cls.model.created_at, cls.model.id) < tuple_(*after)
+            )
+        return list(await session.execute(stmt))
+
+    @classmethod
+    async def search_by_feature(
+        cls,
+        session: AsyncSession,
+        title: str,
+        value: str,
+        match: FeatureMatchModes,
+        limit: int,
+        after: int | None = None,
+    ) -> list[int]:
+        """
+        Returns up to `limit` ids, greater than `after`, of the users who have
+        the feature `title` with a value matching exactly, by prefix or by trigrams.
+        Features are walked by the (title, user_id) index in the user id order and
+        their values are probed by the (feature_id, value) or the trigram index.
+        """
+
+        value_column = UserRelatedFeatureValue.value
+        if match is FeatureMatchModes.PREFIX:
+            value_criteria = value_column.startswith(value, autoescape=True)
+        elif match is FeatureMatchModes.FUZZY:
+            value_criteria = value_column.op("%")(value)
+        else:
+            value_criteria = value_column == value
+
+        stmt = (
+            select(UserRelatedFeatures.user_id)
+            .distinct()
+            .where(
+                UserRelatedFeatures.title == title,
+                select(UserRelatedFeatureValue.id)
+                .where(
+                    UserRelatedFeatureValue.feature_id == UserRelatedFeatures.id,
+                    value_criteria,
+                )
+                .exists(),
+            )
+            .order_by(UserRelatedFeatures.user_id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(UserRelatedFeatures.user_id > after)
+        return list(await session.scalars(stmt))
+
+    @classmethod
+    async def stream_export(
+        cls, session: AsyncSession, filters: UserFilterSchema, batch_size: int
+    ) -> AsyncIterator[dict]:
+        """
+        Streams the filtered users with the group title and the features tree as dicts.
+        Rows are built by one Core select, the features are aggregated into JSON by the
+        database, and fetched by `batch_size` through a server-side cursor.
+        """
+
+        empty_json = literal_column("'[]'::json")
+        values = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            UserRelatedFeatureValue.value, UserRelatedFeatureValue.id
+                        )
+                    ),
+                    empty_json,
+                )
+            )
+            .where(UserRelatedFeatureValue.feature_id == UserRelatedFeatures.id)
+            .scalar_subquery()
+        )
+        features = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "title", UserRelatedFeatures.title, "values", values
+                            ),
+                            UserRelatedFeatures.id,
+                        )
+                    ),
+                    empty_json,
+                    type_=JSON,
+                )
+            )
+            .where(UserRelatedFeatures.user_id == cls.model.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                cls.model.id,
+                cls.model.email,
+                cls.model.first_name,
+                cls.model.last_name,
+                cls.model.group_id,
+                UserGroup.title.label("group"),
+                cls.model.is_active,
+                cls.model.created_at,
+                cls.model.last_login,
+                features.label("features"),
+            )
+            .join(UserGroup, cls.model.group_id == UserGroup.id)
+            .where(*cls.filter_criteria(filters))
+            .order_by(cls.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        result = await session.stream(stmt)
+        async for row in result.mappings():
+            yield dict(row)
+
+    @classmethod
+    def _features_snapshot(cls) -> ScalarSelect:
+        """
+        Builds the features tree of the user row as JSONB, in the id order,
+        in the `UserRelatedFeaturesScheme` shape.
+        """
+
+        empty_jsonb = literal_column("'[]'::jsonb")
+        values = (
+            select(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(
+                            func.jsonb_build_object(
+                                "id",
+                                UserRelatedFeatureValue.id,
+                                "value",
+                                UserRelatedFeatureValue.value,
+                            ),
+                            UserRelatedFeatureValue.id,
+                        )
+                    ),
+                    empty_jsonb,
+                )
+            )
+            .where(UserRelatedFeatureValue.feature_id == UserRelatedFeatures.id)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(
+                            func.jsonb_build_object(
+                                "id",
+                                UserRelatedFeatures.id,
+                                "title",
+                                UserRelatedFeatures.title,
+                                "values",
+                                values,
+                            ),
+                            UserRelatedFeatures.id,
+                        )
+                    ),
+                    empty_jsonb,
+                    type_=JSONB,
+                )
+            )
+            .where(UserRelatedFeatures.user_id == cls.model.id)
+            .scalar_subquery()
+        )
+
+    @classmethod
+    async def sync_features_snapshot(
+        cls, session: AsyncSession, user_ids: list[int], only_drifted: bool = False
+    ) -> list[int]:
+        """
+        Rebuilds the features snapshot of the users from the features tables,
+        in the current transaction. Returns the ids of the updated users.
+        """
+
+        snapshot = cls._features_snapshot()
+        stmt = (
+            update(cls.model)
+            .where(cls.model.id.in_(user_ids))
+            .values(features_snapshot=snapshot)
+            .returning(cls.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        if only_drifted:
+            stmt = stmt.where(cls.model.features_snapshot.is_distinct_from(snapshot))
+        return list(await session.scalars(stmt))
+
+    @classmethod
+    async def find_drifted_snapshots(
+        cls, session: AsyncSession, user_ids: list[int]
+    ) -> list[Row]:
+        """Returns (id, missing) of the users whose snapshot differs from the tables"""
+
+        snapshot = cls._features_snapshot()
+        stmt = select(
+            cls.model.id, cls.model.features_snapshot.is_(None).label("missing")
+        ).where(
+            cls.model.id.in_(user_ids),
+            cls.model.features_snapshot.is_distinct_from(snapshot),
+        )
+        return list(await session.execute(stmt))
+
+    @classmethod
+    async def get_ids_after(
+        cls, session: AsyncSession, after: int, limit: int
+    ) -> list[int]:
+        """Returns the next `limit` user ids greater than `after`"""
+
+        stmt = (
+            select(cls.model.id)
+            .where(cls.model.id > after)
+            .order_by(cls.model.id)
+            .limit(limit)
+        )
+        return list(await session.scalars(stmt))
+
+    @classmethod
+    async def delete_user(
+        cls, session: AsyncSession, user_id: int, *criteria: ColumnElement[bool]
+    ) -> bool:
+        """
+        Deletes the user with the whole features tree, within the current transaction.
+        The statements count does not depend on the features count.
+        """
+
+        deleted_ids = await cls.delete_objects(
+            session, cls.model, cls.model.id == user_id, *criteria, returning=True
+        )
+        return bool(deleted_ids)
+
+    @classmethod
+    async def delete_related_objects(
+        cls,
+        table_name: DbBaseModel,
+        parent_id: int,
+        parent_model: DbBaseModel,
+        session: AsyncSession,
+        returning: bool = False,
+    ) -> list[int] | int:
+        """
+        Deletes all related objects of the parent by set-based deletes and resyncs
+        the features snapshot of the owning user when features or values are deleted.
+        The cached profile is left to the caller to invalidate after the commit.
+        """
+
+        user_id = None
+        if parent_model is cls.model:
+            user_id = parent_id
+        elif parent_model is UserRelatedFeatures:
+            user_id = await session.scalar(
+                select(UserRelatedFeatures.user_id).where(
+                    UserRelatedFeatures.id == parent_id
+                )
+            )
+
+        deleted = await super().delete_related_objects(
+            table_name, parent_id, parent_model, session, returning=returning
+        )
+        if user_id is not None and settings.cache.features_snapshot:
+            await cls.sync_features_snapshot(session, [user_id])
+        return deleted
+
+    @classmethod
+    async def _delete_exhausted_user(cls, session: AsyncSession, user_id: int):
+        """Deletes the user who has used the last attempt, within the current transaction"""
+
+        await cls.delete_user(session, user_id, cls.model.attempts_count == 0)
+
     @classmethod
     async def verify_account(
         cls, session: AsyncSession, data: AccountVerificationScheme
-    ):
+    ) -> int:
         """
         Verifies user account, in case of wrong otp will be risen exception.
         if wrong attempts gets up to max_attempts count account will be deleted.
+        Attempts are counted by conditional updates, so parallel requests can't exceed the limit.
+        Returns the id of the verified user.
         """
 
-        user = await cls.get_user(session=session, email=data.email)
-        if not user:
-            raise UserDoesNotFound
+        pending_user = (
+            cls.email_is(data.email),
+            cls.model.is_active.is_not(True),
+            cls.model.attempts_count > 0,
+            cls.model.otp_expires_at > datetime.datetime.utcnow(),
+        )
 
-        if user.is_active:
-            raise AccountAlreadyVerified
+        verify_stmt = (
+            update(cls.model)
+            .where(
+                *pending_user,
+                cls.model.otp_code == data.otp_code,
+                cls.model.otp_purpose == OTPPurposes.VERIFICATION.value,
+            )
+            .values(
+                is_active=True,
+                otp_code=None,
+                otp_purpose=None,
+                otp_expires_at=None,
+                attempts_count=OTP_MAX_ATTEMPTS,
+            )
+            .returning(cls.model.id)
+        )
+        if (user_id := await session.scalar(verify_stmt)) is not None:
+            return user_id
 
-        if user.otp_code != data.otp_code:
-            user.attempts_count -= 1
-            if user.attempts_count == 0:
-                await session.delete(user)
-                await session.commit()
+        attempt_stmt = (
+            update(cls.model)
+            .where(*pending_user)
+            .values(attempts_count=cls.model.attempts_count - 1)
+            .returning(cls.model.id, cls.model.attempts_count)
+        )
+        result = await session.execute(attempt_stmt)
+        if attempt := result.one_or_none():
+            if attempt.attempts_count == 0:
+                await cls._delete_exhausted_user(session, attempt.id)
                 raise AccountDeleted
-            await session.commit()
-            raise InvalidOTP(attempts_num=user.attempts_count)
+            raise InvalidOTP(attempts_num=attempt.attempts_count)
 
-        user.attempts_count = 3
-        user.otp_code = None
-        user.is_active = True
-        await session.commit()
+        state_stmt = select(cls.model.is_active).where(cls.email_is(data.email))
+        result = await session.execute(state_stmt)
+        if not (state := result.one_or_none()):
+            raise UserDoesNotFound
+        if state.is_active:
+            raise AccountAlreadyVerified
+        raise OTPExpired
 
     @classmethod
-    async def update_data(cls, user_id: int, session: AsyncSession, data: dict):
-        filter_data = dict(id=user_id)
-        await cls.update_existing_data(
-            session=session, base_data=data, model=cls.model, filter_kwargs=filter_data
+    async def confirm_password_reset(
+        cls, session: AsyncSession, email: str, otp_code: str, password: bytes
+    ) -> int:
+        """
+        Sets the new password if the password reset OTP code is valid and consumes it
+        by one conditional update, so a code can't be used by two parallel requests.
+        Returns the id of the user.
+        """
+
+        reset_code = (
+            cls.email_is(email),
+            cls.model.otp_code == otp_code,
+            cls.model.otp_purpose == OTPPurposes.PASSWORD_RESET.value,
         )
+        confirm_stmt = (
+            update(cls.model)
+            .where(
+                *reset_code,
+                cls.model.otp_expires_at > datetime.datetime.utcnow(),
+            )
+            .values(
+                otp_code=None,
+                otp_purpose=None,
+                otp_expires_at=None,
+                password=password,
+            )
+            .returning(cls.model.id)
+        )
+        if (user_id := await session.scalar(confirm_stmt)) is not None:
+            return user_id
+
+        if await session.scalar(select(cls.model.id).where(*reset_code)) is None:
+            raise UserDoesNotFound
+        raise OTPExpired
+
+    @classmethod
+    async def update_data(
+        cls,
+        user_id: int,
+        session: AsyncSession,
+        data: dict,
+        load_options: Sequence[ORMOption] = (),
+    ) -> User:
+        """Updates the user, relationships are loaded only by `load_options`"""
 
-        user = await cls.get_user(session=session, id=user_id)
-        await session.refresh(user)
+        user = await cls.update_existing_data(
+            session=session,
+            base_data=data,
+            model=cls.model,
+            filter_kwargs=dict(id=user_id),
+            load_options=load_options,
+        )
+        if user is None:
+            raise UserDoesNotFound
         return user
 
     @classmethod
     async def request_otp(cls, session: AsyncSession, user: User):
         """Makes a new OTP code and the same time will be decreased user.attempts_count"""
-        user.otp_code = generate_otp_code()
-        user.attempts_count -= 1
-        if user.attempts_count == 0:
-            await session.delete(user)
-            await session.commit()
+
+        otp = otp_generator.generate(OTPPurposes.VERIFICATION, previous=user.otp_code)
+        stmt = (
+            update(cls.model)
+            .where(
+                cls.model.id == user.id,
+                cls.model.is_active.is_not(True),
+                cls.model.attempts_count > 0,
+            )
+            .values(
+                attempts_count=cls.model.attempts_count - 1, **otp.as_user_fields()
+            )
+            .returning(cls.model.attempts_count)
+        )
+
+        attempts_count = await session.scalar(stmt)
+        if attempts_count is None:
+            raise UserDoesNotFound
+        if attempts_count == 0:
+            await cls._delete_exhausted_user(session, user.id)
             raise AccountDeleted
-        await session.commit()
 
     @classmethod
     async def update_profile_photo(
@@ -137,4 +646,4 @@ class UserRepository(BaseRepository):
     ):
         """Creates a new reference to user photo"""
         user.photo = file_path
-        await session.commit()
+        await session.flush()
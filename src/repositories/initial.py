@@ -1,59 +1,92 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import select, inspect, update
-from sqlalchemy.orm import RelationshipProperty, RelationshipDirection
+from sqlalchemy import column, delete, select, insert, text, update, values
 
 from src.exceptions.base_exceptions import ObjectDoesNotExists
-from src.schemas.base import GenericSchema
+from src.repositories._diff import RowsDiff, changed_fields, match_children
+from src.repositories._metadata import ModelMetadata, get_model_metadata
 
 if TYPE_CHECKING:
     from src.core.constants import DbBaseModel
     from pydantic import BaseModel as PydanticBase
-    from typing import Iterable, Callable
-    from src.core.database import BaseModel
+    from typing import Iterable, Sequence
+    from sqlalchemy.orm.interfaces import ORMOption
+    from sqlalchemy import ColumnElement
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
-ISONETOONE: Callable[[RelationshipProperty], bool] = (
-    lambda related_column: related_column.direction == RelationshipDirection.ONETOMANY
-    and related_column.uselist is False
-)
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
 
 
 class BaseRepository:
     """Base repository class, here is implemented for the general purpose created logics."""
 
     @classmethod
-    async def delete_related_objects(
+    async def delete_objects(
         cls,
-        table_name: str,
-        parent_id: int,
-        parent_model: BaseModel,
         session: AsyncSession,
-    ):
-        """Deletes all related objects."""
+        model: DbBaseModel,
+        *criteria: ColumnElement[bool],
+        returning: bool = False,
+    ) -> list[int] | int:
+        """
+        Deletes the rows matched by the criteria together with their one-to-many children.
+        Every model level is removed by one set-based `DELETE`, children first,
+        the rows are never loaded into the session.
+        Denormalized copies of the deleted rows (e.g. `user.features_snapshot`)
+        are not touched, the caller resyncs them in the same transaction.
+        Returns the deleted ids if `returning` is set, otherwise the deleted rows count.
+        """
 
-        stmt = select(table_name).join(parent_model).where(parent_model.id == parent_id)
-        result = await session.scalars(stmt)
-        deleting_data = result.unique().all()
+        deleting_ids = select(model.id).where(*criteria)
+        for relation in get_model_metadata(model).child_relations:
+            await cls.delete_objects(
+                session,
+                relation.model,
+                getattr(relation.model, relation.parent_column).in_(deleting_ids),
+            )
 
-        for del_data in deleting_data:
-            await session.delete(del_data)
+        stmt = (
+            delete(model)
+            .where(*criteria)
+            .execution_options(synchronize_session=False)
+        )
+        if returning:
+            result = await session.scalars(stmt.returning(model.id))
+            return list(result)
+        result = await session.execute(stmt)
+        return result.rowcount
 
     @classmethod
-    async def get_object_existence(
-        cls, session: AsyncSession, model: DbBaseModel, **filter_kwargs
-    ):
-        """Checking object existing depended on filter kwargs"""
-
-        stmt = select(model).filter_by(**filter_kwargs)
-
-        result = await session.scalars(stmt)
-        result = result.one_or_none()
+    async def delete_related_objects(
+        cls,
+        table_name: DbBaseModel,
+        parent_id: int,
+        parent_model: DbBaseModel,
+        session: AsyncSession,
+        returning: bool = False,
+    ) -> list[int] | int:
+        """
+        Deletes all related objects of the parent by set-based deletes.
+        Denormalized copies are left to the caller like in `delete_objects`.
+        """
 
-        if not result:
-            raise ObjectDoesNotExists
+        relation = next(
+            relation
+            for relation in get_model_metadata(parent_model).child_relations
+            if relation.model is table_name
+        )
+        return await cls.delete_objects(
+            session,
+            table_name,
+            getattr(table_name, relation.parent_column) == parent_id,
+            returning=returning,
+        )
 
     @classmethod
     def _preparing_base_fields(
@@ -71,32 +104,40 @@ class BaseRepository:
         return cls._preparing_base_fields(columns, payload)
 
     @classmethod
-    def _get_related_and_base_columns(
+    async def _update_existing_data(
         cls,
-        inspect_table,
-    ) -> tuple[list[RelationshipProperty], Iterable]:
-        """Returns foreign keys and local columns"""
-        related_columns = list(inspect_table.relationships)
-        basic_columns = inspect_table.columns
-        return related_columns, basic_columns
-
-    @classmethod
-    def get_related_and_base_columns(cls, inspect_table):
-        """Public method to deal with protected method `_get_related_and_base_columns`"""
-        return cls._get_related_and_base_columns(inspect_table)
+        session: AsyncSession,
+        base_data: dict,
+        model: DbBaseModel,
+        load_options: Sequence[ORMOption] = (),
+        **kwargs,
+    ) -> DbBaseModel | None:
+        """
+        Updating models and returning the current model instance.
+        The instance is hydrated from the `UPDATE ... RETURNING` row in one round trip,
+        relationships are reloaded only if the caller passes their loader options.
+        """
 
-    @classmethod
-    async def _update_existing_data(
-        cls, session: AsyncSession, base_data: dict, model: DbBaseModel, **kwargs
-    ) -> DbBaseModel:
-        """Updating models and returning the current model instance"""
-
-        stmt = update(model).filter_by(**kwargs).values(**base_data).returning(model)
-        await session.execute(stmt)
-        element_stmt = select(model).filter_by(**kwargs)
-        result = await session.scalars(element_stmt)
+        if base_data:
+            stmt = (
+                update(model).filter_by(**kwargs).values(**base_data).returning(model)
+            )
+        else:
+            stmt = select(model).filter_by(**kwargs)
+        result = await session.scalars(
+            stmt, execution_options={"populate_existing": True}
+        )
         selected_item = result.one_or_none()
-        await session.refresh(selected_item)
+
+        if selected_item is not None and load_options:
+            relations_stmt = (
+                select(model)
+                .where(model.id == selected_item.id)
+                .options(*load_options)
+                .execution_options(populate_existing=True)
+            )
+            result = await session.scalars(relations_stmt)
+            selected_item = result.unique().one()
         return selected_item
 
     @classmethod
@@ -107,148 +148,204 @@ class BaseRepository:
         base_data: dict,
         model: DbBaseModel,
         filter_kwargs: dict,
+        load_options: Sequence[ORMOption] = (),
     ):
         """Update existing data public method , this calls a protected method, jost encapsulates method for update"""
 
-        return cls._update_existing_data(session, base_data, model, **filter_kwargs)
+        return await cls._update_existing_data(
+            session, base_data, model, load_options, **filter_kwargs
+        )
 
     @classmethod
-    async def create_or_update_instance_with_base_fields(
+    async def _insert_rows(
+        cls, session: AsyncSession, model: DbBaseModel, rows: list[dict]
+    ) -> list[int]:
+        """Inserts rows by one multi-row INSERT and returns their ids in the rows order"""
+
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        result = await session.scalars(stmt, rows)
+        return list(result)
+
+    @classmethod
+    async def _update_rows(
         cls,
         session: AsyncSession,
-        prepared_base_data: dict,
         model: DbBaseModel,
-        parent_backref: str,
-        parent_id: int,
-    ) -> DbBaseModel:
-        """Handler for creating or updating the existing instances"""
-
-        if "id" in prepared_base_data:
-            filter_data = dict(id=prepared_base_data["id"])
-            await cls.get_object_existence(session=session, model=model, **filter_data)
-            parent_runtime = await cls._update_existing_data(
-                session=session,
-                base_data=prepared_base_data,
-                id=prepared_base_data["id"],
-                model=model,
-            )
-        else:
-            parent_setter_mapping = {f"{parent_backref}_id": parent_id}
-            parent_runtime = model(**parent_setter_mapping, **prepared_base_data)
-            session.add(parent_runtime)
-            await session.commit()
+        rows: list[dict],
+        parent_column: str,
+    ):
+        """
+        Updates existing rows by one `UPDATE ... FROM (VALUES ...) RETURNING`.
+        A row is updated only if it still exists and belongs to the given parent,
+        otherwise nothing is written and the object is reported as missing.
+        """
 
-        return parent_runtime
+        keys = list(rows[0])
+        rows_values = values(
+            *(column(key, model.__table__.c[key].type) for key in keys), name="rows"
+        ).data([tuple(row[key] for key in keys) for row in rows])
+        update_columns = {
+            key: rows_values.c[key] for key in keys if key not in ("id", parent_column)
+        }
+        if not update_columns:
+            return
+        if "updated_at" in get_model_metadata(model).columns:
+            update_columns["updated_at"] = text("CURRENT_TIMESTAMP")
+
+        stmt = (
+            update(model)
+            .where(
+                model.id == rows_values.c.id,
+                getattr(model, parent_column) == rows_values.c[parent_column],
+            )
+            .values(update_columns)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.scalars(stmt)
+        if len(set(result)) != len(rows):
+            raise ObjectDoesNotExists
 
     @classmethod
-    async def combine_relations(
+    async def _write_rows(
         cls,
-        *,
         session: AsyncSession,
-        callable_func: Callable,
-        inner_relations: Iterable[RelationshipProperty],
-        payload: dict,
-        parent_runtime: DbBaseModel,
-    ):
-        """Combines and deals with relations"""
-
-        for related_column in inner_relations:
-            if (
-                related_column.direction == RelationshipDirection.ONETOMANY
-                and related_column.key in payload
-            ):
-                await callable_func(
-                    related_column.mapper.entity,
-                    GenericSchema(data=payload.get(related_column.key)),
-                    session=session,
-                    parent_id=parent_runtime.id,
-                    parent_backref=related_column.back_populates,
-                )
-            elif all(
-                [
-                    ISONETOONE(related_column),
-                    related_column.key in payload,
-                ]
+        model: DbBaseModel,
+        rows: list[dict],
+        parent_column: str,
+    ) -> list[int]:
+        """Writes rows by one statement per columns set, returns ids in the rows order"""
+
+        ids: list[int | None] = [row.get("id") for row in rows]
+        groups: dict[tuple[bool, frozenset], list[int]] = defaultdict(list)
+        for index, row in enumerate(rows):
+            groups[("id" in row, frozenset(row))].append(index)
+
+        for (is_existing, _), indexes in groups.items():
+            group_rows = [rows[index] for index in indexes]
+            if is_existing:
+                await cls._update_rows(session, model, group_rows, parent_column)
+                continue
+            for index, row_id in zip(
+                indexes, await cls._insert_rows(session, model, group_rows)
             ):
-                await callable_func(
-                    related_column.mapper.entity,
-                    GenericSchema(data=payload.get(related_column.key)),
-                    session=session,
-                    parent_id=parent_runtime.id,
-                    parent_backref=related_column.back_populates,
-                )
-            # elif related_column.direction.MANYTOONE:
-            # elif related_column.direction.MANYTOONE:
+                ids[index] = row_id
+
+        return ids
 
     @classmethod
-    async def routine_creation_or_update_instances(
+    async def save_diff(
         cls,
-        *,
         session: AsyncSession,
-        base_columns: Iterable,
-        payload: dict,
         model: DbBaseModel,
-        inner_relations: Iterable,
-        parent_id: int | None = None,
-        parent_backref: str | None = None,
+        items: list[tuple[dict, Any | None, int]],
+        parent_column: str,
+        diff: dict[str, RowsDiff],
+        key: str,
     ):
-        """Will be created or updated `model` instance depending on their existence"""
-
-        prepared_base_data = cls._preparing_base_fields(
-            base_columns, GenericSchema(data=payload)
-        )
-        parent_runtime = await cls.create_or_update_instance_with_base_fields(
-            session=session,
-            prepared_base_data=prepared_base_data,
-            model=model,
-            parent_backref=parent_backref,
-            parent_id=parent_id,
-        )
+        """
+        Writes only the changed rows of one model level, the (payload, current object,
+        parent id) items are inserted if there is no current object and updated by the
+        changed columns only, the unchanged ones are skipped.
+        """
 
-        await cls.combine_relations(
-            session=session,
-            callable_func=cls.find_relations,
-            inner_relations=inner_relations,
-            payload=payload,
-            parent_runtime=parent_runtime,
+        if not items:
+            return
+
+        metadata = get_model_metadata(model)
+        rows, row_indexes = [], []
+        ids: list[int | None] = []
+        for index, (payload, current, parent_id) in enumerate(items):
+            if current is None:
+                row = cls._preparing_base_fields(metadata.columns, payload)
+                row.pop("id", None)
+                diff[key].inserted += 1
+            elif changes := changed_fields(metadata.columns, payload, current):
+                row = {**changes, "id": current.id}
+                diff[key].updated += 1
+            else:
+                ids.append(current.id)
+                diff[key].unchanged += 1
+                continue
+            ids.append(None)
+            rows.append({**row, parent_column: parent_id})
+            row_indexes.append(index)
+
+        written_ids = await cls._write_rows(session, model, rows, parent_column)
+        for index, row_id in zip(row_indexes, written_ids):
+            ids[index] = row_id
+
+        await cls._save_children_diff(
+            session,
+            metadata,
+            [(payload, current) for payload, current, _ in items],
+            ids,
+            diff,
         )
 
     @classmethod
-    async def find_relations(
+    async def _save_children_diff(
         cls,
-        model,
-        payload: BaseModel | GenericSchema,
         session: AsyncSession,
-        parent_id=None,
-        parent_backref=None,
+        metadata: ModelMetadata,
+        items: list[tuple[dict, Any | None]],
+        ids: list[int],
+        diff: dict[str, RowsDiff],
     ):
+        """Matches submitted children with the current ones and deletes dropped ones"""
+
+        for relation in metadata.child_relations:
+            child_metadata = get_model_metadata(relation.model)
+            child_items, deleting_ids = [], []
+            for (payload, current), row_id in zip(items, ids):
+                if relation.key not in payload:
+                    continue
+                children = payload[relation.key]
+                current_children = getattr(current, relation.key) if current else None
+                pairs, dropped_ids = match_children(
+                    relation.model,
+                    child_metadata.columns,
+                    children if isinstance(children, list) else [children],
+                    _as_list(current_children),
+                )
+                child_items.extend((child, obj, row_id) for child, obj in pairs)
+                deleting_ids.extend(dropped_ids)
+
+            if deleting_ids:
+                diff[relation.key].deleted += await cls.delete_objects(
+                    session, relation.model, relation.model.id.in_(deleting_ids)
+                )
+            await cls.save_diff(
+                session,
+                relation.model,
+                child_items,
+                relation.parent_column,
+                diff,
+                relation.key,
+            )
+
+    @classmethod
+    async def apply_diff(
+        cls, session: AsyncSession, instance: DbBaseModel, payload: dict
+    ) -> dict[str, RowsDiff]:
         """
-        Finds the relations and recursively creates or updates existing instances.
+        Writes the difference between the payload and the loaded instance tree,
+        the relationships of the payload have to be loaded on the instance.
+        Returns the diff summary of the instance and each relation.
         """
 
-        inspect_table = inspect(model)
-        payload = payload.model_dump(exclude_unset=True, exclude_none=True)
-
-        inner_relations, base_columns = cls._get_related_and_base_columns(inspect_table)
-        if isinstance(payload, list):
-            for p_item in payload:
-                await cls.routine_creation_or_update_instances(
-                    session=session,
-                    base_columns=base_columns,
-                    payload=p_item,
-                    model=model,
-                    inner_relations=inner_relations,
-                    parent_id=parent_id,
-                    parent_backref=parent_backref,
-                )
+        metadata = get_model_metadata(type(instance))
+        key = metadata.model.__tablename__
+        diff: dict[str, RowsDiff] = defaultdict(RowsDiff)
 
-        else:
-            await cls.routine_creation_or_update_instances(
-                session=session,
-                base_columns=base_columns,
-                payload=payload,
-                model=model,
-                inner_relations=inner_relations,
-                parent_id=parent_id,
-                parent_backref=parent_backref,
+        await cls._save_children_diff(
+            session, metadata, [(payload, instance)], [instance.id], diff
+        )
+        if changes := changed_fields(metadata.columns, payload, instance):
+            await cls._update_existing_data(
+                session, changes, metadata.model, id=instance.id
             )
+            diff[key].updated += 1
+        else:
+            diff[key].unchanged += 1
+        return diff
@@ -0,0 +1,105 @@
+import io
+
+from fastapi import APIRouter, Depends, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.configs import settings
+from src.core.constants import (
+    DataFormats,
+    FeatureMatchModes,
+    USERS_MAX_PAGE_SIZE,
+    USERS_PAGE_SIZE,
+)
+from src.core.database import get_session
+from src.core.hashing import password_hasher
+from src.core.jwt_cache import verified_token_cache
+from src.core.profile_cache import profile_cache
+from src.schemas.user import (
+    FeatureSearchPageSchema,
+    UserFilterSchema,
+    UserImportSummarySchema,
+    UserPageSchema,
+)
+from src.services import user_export_service, user_import_service, user_service
+from src.utils.auth_helpers import validate_admin_user
+
+EXPORT_MEDIA_TYPES = {
+    DataFormats.CSV: "text/csv",
+    DataFormats.NDJSON: "application/x-ndjson",
+}
+
+admin_router = APIRouter(
+    prefix=f"{settings.api_version}/admin",
+    tags=["Admin"],
+    dependencies=[Depends(validate_admin_user)],
+)
+
+
+@admin_router.get("/metrics")
+async def metrics():
+    return {
+        "profile_cache": profile_cache.stats(),
+        "token_cache": verified_token_cache.stats(),
+        "hashing": password_hasher.metrics.snapshot(),
+    }
+
+
+@admin_router.get("/users", response_model=UserPageSchema)
+async def list_users(
+    filters: UserFilterSchema = Depends(),
+    limit: int = Query(USERS_PAGE_SIZE, ge=1, le=USERS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    return await user_service.list_users(
+        session=session, filters=filters, limit=limit, cursor=cursor
+    )
+
+
+@admin_router.get("/users/features/search", response_model=FeatureSearchPageSchema)
+async def search_users_by_feature(
+    title: str,
+    value: str = Query(min_length=1),
+    match: FeatureMatchModes = FeatureMatchModes.EXACT,
+    limit: int = Query(USERS_PAGE_SIZE, ge=1, le=USERS_MAX_PAGE_SIZE),
+    cursor: int | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    return await user_service.search_by_feature(
+        session=session,
+        title=title,
+        value=value,
+        match=match,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+@admin_router.post("/users/import", response_model=UserImportSummarySchema)
+async def import_users(
+    file: UploadFile,
+    data_format: DataFormats = DataFormats.CSV,
+    activate: bool = False,
+):
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return await user_import_service.import_users(
+        lines=lines, data_format=data_format, activate=activate
+    )
+
+
+@admin_router.get("/users/export")
+async def export_users(
+    data_format: DataFormats = DataFormats.NDJSON,
+    filters: UserFilterSchema = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    return StreamingResponse(
+        user_export_service.export_users(
+            session=session, data_format=data_format, filters=filters
+        ),
+        media_type=EXPORT_MEDIA_TYPES[data_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{data_format.value}"'
+        },
+    )
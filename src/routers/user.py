@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status, UploadFile
+from fastapi import APIRouter, Depends, Response, status, UploadFile
 from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.security.oauth2 import OAuth2PasswordBearer
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -8,7 +8,12 @@ from src.core.database import get_session
 from src.core.configs import SUPPORTED_IMAGE_TYPES, settings
 from src.schemas.base import BaseMessageResponse
 from src.utils.auth_helpers import validate_authenticated_user_token, auth_scheme
-from src.schemas.user import UserResponseSchema, UserCreateSchema, UserUpdateSchema
+from src.schemas.user import (
+    UserResponseSchema,
+    UserCreateSchema,
+    UserUpdateSchema,
+    UserPatchResponseSchema,
+)
 from src.schemas.auth import (
     LoginSchema,
     AccountVerificationScheme,
@@ -55,20 +60,19 @@ async def profile(
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(validate_authenticated_user_token),
 ):
-    user = await user_service.get_user(id=user_id, session=session)
-    return UserResponseSchema.model_validate(user)
+    content = await user_service.get_profile(session=session, user_id=user_id)
+    return Response(content=content, media_type="application/json")
 
 
-@user_router.patch("/profile", response_model=UserResponseSchema)
+@user_router.patch("/profile", response_model=UserPatchResponseSchema)
 async def update_profile(
     payload: UserUpdateSchema,
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(validate_authenticated_user_token),
 ):
-    user = await user_service.patch_user(
+    return await user_service.patch_user(
         session=session, payload=payload, user_id=user_id
     )
-    return UserResponseSchema.model_validate(user)
 
 
 @user_router.patch("/profile-photo", response_model=BaseMessageResponse)
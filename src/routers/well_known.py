@@ -0,0 +1,24 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response, status
+
+from src.core.configs import settings
+from src.core.keys import key_manager
+
+well_known_router = APIRouter(prefix="/.well-known", tags=["Well known"])
+
+
+@well_known_router.get("/jwks.json")
+async def jwks(request: Request):
+    content = json.dumps(key_manager.jwks, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.auth.jwks_max_age}",
+        "ETag": etag,
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -7,6 +7,7 @@ from pydantic import EmailStr, BaseModel, ConfigDict, field_validator, Field
 
 from src import messages
 from src.core.constants import PASSWORD_CHECKER_PATTERN
+from src.utils.base_helpers import normalize_email
 
 
 class UserRelatedFeaturesValueScheme(BaseModel):
@@ -32,6 +33,10 @@ class UserCreateSchema(UserBaseSchema):
     group_id: int = 2
     password: Annotated[str, MinLen(6), MaxLen(12)]
 
+    @field_validator("email")
+    def val_email(cls, value: str):
+        return normalize_email(value)
+
     @field_validator("password")
     def val_password(cls, value: str):
         if not re.match(PASSWORD_CHECKER_PATTERN, value):
@@ -55,6 +60,66 @@ class UserResponseSchema(UserBaseSchema):
     photo: str | bytes | None = None
 
 
+class RowsDiffSchema(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+class ProfileDiffSchema(BaseModel):
+    user: RowsDiffSchema = Field(default_factory=RowsDiffSchema)
+    features: RowsDiffSchema = Field(default_factory=RowsDiffSchema)
+    values: RowsDiffSchema = Field(default_factory=RowsDiffSchema)
+
+
+class UserPatchResponseSchema(UserResponseSchema):
+    diff: ProfileDiffSchema
+
+
+class ImportRowErrorSchema(BaseModel):
+    line: int
+    email: str | None = None
+    errors: list[str]
+
+
+class UserImportSummarySchema(BaseModel):
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: list[ImportRowErrorSchema] = Field(default_factory=list)
+
+
+class UserFilterSchema(BaseModel):
+    group_id: int | None = None
+    is_active: bool | None = None
+    created_from: datetime.datetime | None = None
+    created_to: datetime.datetime | None = None
+    last_login_from: datetime.datetime | None = None
+    last_login_to: datetime.datetime | None = None
+
+
+class UserSummarySchema(UserBaseSchema):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    group_id: int
+    is_active: bool | None = None
+    created_at: datetime.datetime
+    last_login: Optional[datetime.datetime] = None
+
+
+class UserPageSchema(BaseModel):
+    items: list[UserSummarySchema] = Field(default_factory=list)
+    next_cursor: str | None = None
+
+
+class FeatureSearchPageSchema(BaseModel):
+    user_ids: list[int] = Field(default_factory=list)
+    next_cursor: int | None = None
+
+
 class UserGroupScheme(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: Optional[int] = None
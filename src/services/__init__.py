@@ -1,6 +1,17 @@
 from ._user_service import UserServie as user_service
+from ._token_maintenance_service import (
+    TokenMaintenanceService as token_maintenance_service,
+)
+from ._user_import_service import UserImportService as user_import_service
+from ._user_export_service import UserExportService as user_export_service
+from ._profile_snapshot_service import (
+    ProfileSnapshotService as profile_snapshot_service,
+)
 
 __all__ = [
-    "user_service"
+    "user_service",
+    "token_maintenance_service",
+    "user_import_service",
+    "user_export_service",
+    "profile_snapshot_service",
 ]
-
@@ -0,0 +1,63 @@
+import logging
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from src.core.configs import settings
+from src.core.profile_cache import profile_cache
+from src.core.unit_of_work import UnitOfWork
+from src.repositories import user_repository
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileSnapshotService:
+    """Consistency of the denormalized `user.features_snapshot` column"""
+
+    @classmethod
+    async def check(cls, session: AsyncSession, batch_size: int | None = None) -> dict:
+        """
+        Compares every snapshot with the features tables in batches of users.
+        Returns the number of checked users, of drifted and of missing snapshots.
+        """
+
+        batch_size = batch_size or settings.maintenance.snapshot_batch_size
+        report = {"checked": 0, "drifted": 0, "missing": 0}
+        after = 0
+        while user_ids := await user_repository.get_ids_after(
+            session, after=after, limit=batch_size
+        ):
+            for row in await user_repository.find_drifted_snapshots(session, user_ids):
+                report["missing" if row.missing else "drifted"] += 1
+            report["checked"] += len(user_ids)
+            after = user_ids[-1]
+
+        logger.info("Features snapshot check: %s", report)
+        return report
+
+    @classmethod
+    async def rebuild(cls, session: AsyncSession, batch_size: int | None = None) -> int:
+        """
+        Rewrites the drifted and missing snapshots, one transaction per batch of
+        users, and drops their cached profiles. Returns the number of rebuilt ones.
+        """
+
+        batch_size = batch_size or settings.maintenance.snapshot_batch_size
+        rebuilt = 0
+        after = 0
+        while True:
+            async with UnitOfWork(session):
+                user_ids = await user_repository.get_ids_after(
+                    session, after=after, limit=batch_size
+                )
+                rebuilt_ids = await user_repository.sync_features_snapshot(
+                    session, user_ids, only_drifted=True
+                )
+            for user_id in rebuilt_ids:
+                await profile_cache.invalidate(user_id)
+            rebuilt += len(rebuilt_ids)
+            if len(user_ids) < batch_size:
+                break
+            after = user_ids[-1]
+
+        logger.info("Features snapshot rebuild updated %s users", rebuilt)
+        return rebuilt
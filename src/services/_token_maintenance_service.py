@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from src.core.configs import settings
+from src.core.database import async_session
+from src.core.unit_of_work import UnitOfWork
+from src.repositories import token_repository
+
+logger = logging.getLogger(__name__)
+
+
+class TokenMaintenanceService:
+    """Token table maintenance jobs"""
+
+    @classmethod
+    async def purge(cls, session: AsyncSession, batch_size: int | None = None) -> int:
+        """
+        Removes expired and revoked token pairs in bounded batches, one transaction
+        per batch, and returns the number of removed rows.
+        Whole partitions are dropped when the token table is partitioned.
+        """
+
+        batch_size = batch_size or settings.maintenance.token_purge_batch_size
+        removed_rows = 0
+
+        if await token_repository.is_partitioned(session):
+            await cls.ensure_partitions(session)
+            async with UnitOfWork(session):
+                removed_rows += await token_repository.drop_expired_partitions(session)
+
+        while True:
+            async with UnitOfWork(session):
+                deleted_rows = await token_repository.purge_expired(
+                    session, batch_size=batch_size
+                )
+            removed_rows += deleted_rows
+            if deleted_rows < batch_size:
+                break
+
+        logger.info("Token purge removed %s rows", removed_rows)
+        return removed_rows
+
+    @classmethod
+    async def ensure_partitions(cls, session: AsyncSession):
+        """Creates the upcoming monthly partitions of a partitioned token table"""
+
+        if not await token_repository.is_partitioned(session):
+            return
+        async with UnitOfWork(session):
+            await token_repository.create_partitions(
+                session, months_ahead=settings.maintenance.token_partitions_ahead
+            )
+
+    @classmethod
+    async def partition(cls, session: AsyncSession):
+        """
+        Converts the token table into a monthly range partitioned one,
+        an already partitioned table gets its upcoming partitions instead.
+        """
+
+        if await token_repository.is_partitioned(session):
+            await cls.ensure_partitions(session)
+            return
+        async with UnitOfWork(session):
+            await token_repository.partition_table(
+                session, months_ahead=settings.maintenance.token_partitions_ahead
+            )
+
+    @classmethod
+    async def run_periodically(cls, interval: int):
+        """Background job, runs the purge every `interval` seconds"""
+
+        while True:
+            try:
+                async with async_session() as session:
+                    await cls.purge(session)
+            except Exception:
+                logger.exception("Token purge failed")
+            await asyncio.sleep(interval)
@@ -0,0 +1,30 @@
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from src.core.configs import settings
+from src.core.constants import DataFormats
+from src.repositories import user_repository
+from src.schemas.user import UserFilterSchema
+from src.utils.export_helpers import buffered, serialize_records
+
+
+class UserExportService:
+    """Bulk user export"""
+
+    @classmethod
+    def export_users(
+        cls,
+        session: AsyncSession,
+        data_format: DataFormats,
+        filters: UserFilterSchema,
+    ) -> AsyncIterator[str]:
+        """
+        Returns the serialized users as chunks of NDJSON lines or CSV rows.
+        Only one cursor batch and one output buffer are held in memory.
+        """
+
+        records = user_repository.stream_export(
+            session, filters, batch_size=settings.exports.batch_size
+        )
+        return buffered(serialize_records(records, data_format))
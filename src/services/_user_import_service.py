@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, Iterator
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from src import messages
+from src.core.configs import settings
+from src.core.constants import DataFormats, OTPPurposes, OTP_MAX_ATTEMPTS
+from src.core.database import async_session
+from src.core.hashing import import_password_hasher
+from src.core.unit_of_work import UnitOfWork
+from src.repositories import user_repository, user_group_repository
+from src.schemas.user import (
+    ImportRowErrorSchema,
+    UserCreateSchema,
+    UserImportSummarySchema,
+)
+from src.utils.import_helpers import chunked, iter_records
+from src.utils.otp_helpers import otp_generator
+
+logger = logging.getLogger(__name__)
+
+_import_lock = asyncio.Lock()
+
+
+class UserImportService:
+    """Bulk user import"""
+
+    @classmethod
+    def _record(cls, user: UserCreateSchema, password: bytes, activate: bool) -> tuple:
+        """Returns the `USER_IMPORT_COLUMNS` record of the user"""
+
+        otp_fields = dict(otp_code=None, otp_purpose=None, otp_expires_at=None)
+        if not activate:
+            otp = otp_generator.generate(OTPPurposes.VERIFICATION)
+            otp_fields = otp.as_user_fields()
+        return (
+            user.group_id,
+            user.first_name,
+            user.last_name,
+            user.email,
+            password,
+            otp_fields["otp_code"],
+            otp_fields["otp_purpose"],
+            otp_fields["otp_expires_at"],
+            activate,
+            OTP_MAX_ATTEMPTS,
+        )
+
+    @classmethod
+    def _read_chunk(
+        cls, chunks: Iterator[list], group_ids: set[int]
+    ) -> tuple[int, dict[str, tuple[int, UserCreateSchema]], list] | None:
+        """
+        Reads, parses and validates the next chunk, runs in a worker thread
+        as reading the file and the validation are blocking.
+        Returns the rows count, the valid users by email and the row errors,
+        or None when the lines are exhausted.
+        """
+
+        if (chunk := next(chunks, None)) is None:
+            return None
+
+        valid_users: dict[str, tuple[int, UserCreateSchema]] = {}
+        errors: list[ImportRowErrorSchema] = []
+        for line, record, error in chunk:
+            if error:
+                errors.append(ImportRowErrorSchema(line=line, errors=[error]))
+                continue
+            try:
+                user = UserCreateSchema.model_validate(record)
+            except ValidationError as e:
+                errors.append(
+                    ImportRowErrorSchema(
+                        line=line,
+                        email=record.get("email"),
+                        errors=[
+                            f"{'.'.join(map(str, item['loc']))}: {item['msg']}"
+                            for item in e.errors()
+                        ],
+                    )
+                )
+                continue
+            if user.group_id not in group_ids:
+                error = messages.USER_GROUP_DOES_NOT_EXISTS
+            elif user.email in valid_users:
+                error = messages.EMAIL_DUPLICATION
+            else:
+                valid_users[user.email] = (line, user)
+                continue
+            errors.append(
+                ImportRowErrorSchema(line=line, email=user.email, errors=[error])
+            )
+        return len(chunk), valid_users, errors
+
+    @classmethod
+    async def import_users(
+        cls,
+        lines: Iterable[str],
+        data_format: DataFormats,
+        activate: bool = False,
+        on_error: Callable[[ImportRowErrorSchema], None] | None = None,
+    ) -> UserImportSummarySchema:
+        """
+        Streams CSV or NDJSON lines into the user table chunk by chunk.
+        Every chunk is read and validated by `UserCreateSchema` in a worker thread,
+        its passwords are hashed on the shared import process pool and the valid rows
+        are loaded by `COPY` in one transaction. Every database step opens its own
+        short session, so no connection is held while the file is read or hashed.
+        Imports run one at a time per worker, so they do not compete for the pool.
+        Row errors are passed to `on_error`, the summary keeps the first ones only.
+        Not activated users get a verification OTP like the registered ones.
+        """
+
+        summary = UserImportSummarySchema()
+
+        def report(error: ImportRowErrorSchema):
+            summary.failed += 1
+            if len(summary.errors) < settings.imports.max_reported_errors:
+                summary.errors.append(error)
+            if on_error:
+                on_error(error)
+
+        async with _import_lock:
+            started_at = time.perf_counter()
+            async with async_session() as session:
+                group_ids = await user_group_repository.get_ids(session)
+            chunks = chunked(
+                iter_records(lines, data_format), settings.imports.chunk_size
+            )
+            while result := await run_in_threadpool(cls._read_chunk, chunks, group_ids):
+                rows_count, valid_users, errors = result
+                summary.total += rows_count
+                for error in errors:
+                    report(error)
+                if not valid_users:
+                    continue
+
+                passwords = await asyncio.gather(
+                    *(
+                        import_password_hasher.hash(user.password)
+                        for _, user in valid_users.values()
+                    )
+                )
+                records = [
+                    cls._record(user, password, activate)
+                    for (_, user), password in zip(valid_users.values(), passwords)
+                ]
+                async with async_session() as session, UnitOfWork(session):
+                    inserted_emails = await user_repository.copy_users(
+                        session, records
+                    )
+
+                summary.imported += len(inserted_emails)
+                for email, (line, _) in valid_users.items():
+                    if email not in inserted_emails:
+                        report(
+                            ImportRowErrorSchema(
+                                line=line,
+                                email=email,
+                                errors=[messages.EMAIL_DUPLICATION],
+                            )
+                        )
+
+        summary.seconds = time.perf_counter() - started_at
+        summary.rows_per_second = summary.total / summary.seconds
+        logger.info(
+            "User import: %s rows, %s imported, %s failed, %.0f rows/s",
+            summary.total,
+            summary.imported,
+            summary.failed,
+            summary.rows_per_second,
+        )
+        return summary
@@ -1,13 +1,23 @@
-import asyncio
 import datetime
+from dataclasses import asdict
 
+import jwt
 from fastapi import UploadFile
-from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from src import messages
 from src.core.configs import settings
-from src.core.constants import TokenTypes
+from src.core.profile_cache import profile_cache
+from src.core.revocation import revocation_index
+from src.core.unit_of_work import UnitOfWork
+from src.core.constants import (
+    FeatureMatchModes,
+    TokenTypes,
+    OTPPurposes,
+    OTP_MAX_ATTEMPTS,
+    USERS_PAGE_SIZE,
+    UserLoadProfiles,
+)
 from src.models import User
 from src.exceptions.auth_exceptions import (
     UnAuthorized,
@@ -15,6 +25,8 @@ from src.exceptions.auth_exceptions import (
     AccountAlreadyVerified,
     PasswordsDidNotMatch,
     PermissionDenied,
+    AccountDeleted,
+    InvalidOTP,
 )
 from src.schemas.auth import (
     AccountVerificationScheme,
@@ -24,14 +36,26 @@ from src.schemas.auth import (
     SetNewPasswordScheme,
     RefreshTokenScheme,
 )
-from src.schemas.base import BaseMessageResponse, GenericSchema
-from src.schemas.user import UserCreateSchema, UserUpdateSchema
+from src.schemas.base import BaseMessageResponse
+from src.schemas.user import (
+    FeatureSearchPageSchema,
+    UserCreateSchema,
+    UserUpdateSchema,
+    UserResponseSchema,
+    UserPatchResponseSchema,
+    ProfileDiffSchema,
+    UserFilterSchema,
+    UserPageSchema,
+    UserSummarySchema,
+)
 from src.utils.auth_helpers import (
     hash_password,
     validate_password,
-    generate_otp_code,
     decode_jwt,
+    decode_token_id,
 )
+from src.utils.otp_helpers import otp_generator
+from src.utils.pagination_helpers import decode_cursor, encode_cursor
 from src.repositories import user_repository, token_repository, user_group_repository
 from src.utils.base_helpers import (
     get_file_path,
@@ -45,9 +69,100 @@ class UserServie:
     model = User
 
     @classmethod
-    async def get_user(cls, session: AsyncSession, **kwargs) -> User:
-        """Returns a user instance"""
-        return await user_repository.get_user(session=session, **kwargs)
+    async def get_user(
+        cls,
+        session: AsyncSession,
+        profile: UserLoadProfiles = UserLoadProfiles.FULL,
+        **kwargs,
+    ) -> User:
+        """Returns a user instance loaded by the profile"""
+        return await user_repository.get_user(
+            session=session, profile=profile, **kwargs
+        )
+
+    @classmethod
+    def _snapshot_profile(cls, user: User) -> UserResponseSchema | None:
+        """Builds the profile from the user row and its features snapshot, if any"""
+
+        if user.features_snapshot is None:
+            return None
+        fields = UserResponseSchema.model_fields.keys() - {"features"}
+        return UserResponseSchema(
+            **{field: getattr(user, field) for field in fields},
+            features=user.features_snapshot,
+        )
+
+    @classmethod
+    async def get_profile(cls, session: AsyncSession, user_id: int) -> bytes:
+        """Returns the serialized profile, from the profile cache when it is there"""
+
+        content, version = await profile_cache.lookup(user_id)
+        if content is not None:
+            return content
+
+        profile = None
+        if settings.cache.features_snapshot:
+            user = await cls.get_user(
+                session=session, profile=UserLoadProfiles.SUMMARY, id=user_id
+            )
+            profile = cls._snapshot_profile(user)
+        if profile is None:
+            user = await cls.get_user(
+                session=session, profile=UserLoadProfiles.FULL, id=user_id
+            )
+            profile = UserResponseSchema.model_validate(user)
+        content = profile.model_dump_json().encode()
+        await profile_cache.set(user_id, content, version)
+        return content
+
+    @classmethod
+    async def list_users(
+        cls,
+        session: AsyncSession,
+        filters: UserFilterSchema,
+        limit: int = USERS_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> UserPageSchema:
+        """Returns one page of the newest users and the cursor of the next page"""
+
+        rows = await user_repository.list_users(
+            session=session,
+            filters=filters,
+            limit=limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+        )
+        page = UserPageSchema(
+            items=[UserSummarySchema.model_validate(row) for row in rows[:limit]]
+        )
+        if len(rows) > limit:
+            last = page.items[-1]
+            page.next_cursor = encode_cursor(last.created_at, last.id)
+        return page
+
+    @classmethod
+    async def search_by_feature(
+        cls,
+        session: AsyncSession,
+        title: str,
+        value: str,
+        match: FeatureMatchModes = FeatureMatchModes.EXACT,
+        limit: int = USERS_PAGE_SIZE,
+        cursor: int | None = None,
+    ) -> FeatureSearchPageSchema:
+        """Returns one page of the ids of the users having the matching feature"""
+
+        user_ids = await user_repository.search_by_feature(
+            session=session,
+            title=title,
+            value=value,
+            match=match,
+            limit=limit + 1,
+            after=cursor,
+        )
+        page = FeatureSearchPageSchema(user_ids=user_ids[:limit])
+        if len(user_ids) > limit:
+            page.next_cursor = page.user_ids[-1]
+        return page
 
     @classmethod
     async def create_user(
@@ -57,15 +172,15 @@ class UserServie:
         Will be created a new user and returned a success message.
         if group does not exist in the data so group_id sets 2
         """
-        await asyncio.sleep(1)  # For avoiding repetition of otp_code's
-
         user_data = data.model_dump().copy()
         password = user_data.pop("password")
-        user_data["password"] = hash_password(password)
-        user_data["otp_code"] = generate_otp_code()
-        user_data["attempts_count"] = 3
+        user_data["password"] = await hash_password(password)
+        otp = otp_generator.generate(OTPPurposes.VERIFICATION)
+        user_data.update(otp.as_user_fields())
+        user_data["attempts_count"] = OTP_MAX_ATTEMPTS
         # await user_group_repository.initial_user_groups(session=session)
-        await user_repository.create_user(session=session, user_data=user_data)
+        async with UnitOfWork(session):
+            await user_repository.create_user(session=session, user_data=user_data)
         return BaseMessageResponse(message=messages.USER_CREATED_SUCCESSFULLY)
 
     @classmethod
@@ -74,7 +189,9 @@ class UserServie:
     ) -> BaseMessageResponse:
         """Verifies user account and reruns neither success message nor any exception"""
 
-        await user_repository.verify_account(session=session, data=data)
+        async with UnitOfWork(session, commit_on=(AccountDeleted, InvalidOTP)):
+            user_id = await user_repository.verify_account(session=session, data=data)
+        await profile_cache.invalidate(user_id)
         return BaseMessageResponse(message=messages.ACCOUNT_VERIFIED)
 
     @classmethod
@@ -83,20 +200,27 @@ class UserServie:
     ) -> TokenResponseScheme:
         """Returns a couple of access and refresh tokens"""
 
-        user = await user_repository.get_user(session=session, email=login_data.email)
+        async with UnitOfWork(session):
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.AUTH, email=login_data.email
+            )
 
         if not user.is_active:
             raise UnActivated
 
-        if not validate_password(login_data.password, user.password):
+        if not await validate_password(login_data.password, user.password):
             raise UnAuthorized
 
-        await user_repository.update_data(
-            session=session,
-            data=dict(last_login=datetime.datetime.now()),
-            user_id=user.id,
-        )
-        token_data = await token_repository.tokenize(session=session, user_id=user.id)
+        async with UnitOfWork(session):
+            await user_repository.update_data(
+                session=session,
+                data=dict(last_login=datetime.datetime.now()),
+                user_id=user.id,
+            )
+            token_data = await token_repository.tokenize(
+                session=session, user_id=user.id
+            )
+        await profile_cache.invalidate(user.id)
         return token_data
 
     @classmethod
@@ -109,9 +233,12 @@ class UserServie:
         if token_data["token_type"] != TokenTypes.REFRESH.value:
             raise UnAuthorized
 
-        return await token_repository.refresh_token(
-            session=session, token_data=token_data, payload=payload
-        )
+        async with UnitOfWork(session):
+            new_token_data, revoked = await token_repository.refresh_token(
+                session=session, token_data=token_data
+            )
+        revocation_index.revoke_token(revoked)
+        return new_token_data
 
     @classmethod
     async def logout(
@@ -121,12 +248,19 @@ class UserServie:
     ) -> BaseMessageResponse:
         """Logs out of the user and marks tokens expired"""
 
-        token = await token_repository.check_token_validity(
-            session=session, access_token=token, expired=False
-        )
-        await token_repository.update_token(
-            session=session, expired=True, token_id=token.id
-        )
+        try:
+            token_data = decode_jwt(token)
+        except jwt.exceptions.InvalidTokenError:
+            raise UnAuthorized
+
+        async with UnitOfWork(session):
+            token = await token_repository.check_token_validity(
+                session=session, access_jti=decode_token_id(token_data), expired=False
+            )
+            await token_repository.update_token(
+                session=session, expired=True, token_id=token.id
+            )
+        revocation_index.revoke_token(token)
 
         return BaseMessageResponse(message=messages.LOGOUT)
 
@@ -135,16 +269,20 @@ class UserServie:
         cls, payload: LoginSchema, session: AsyncSession
     ) -> BaseMessageResponse:
         """Resets a new OTP code for the user"""
-        user = await user_repository.get_user(session=session, email=payload.email)
+        async with UnitOfWork(session):
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.AUTH, email=payload.email
+            )
 
-        if not validate_password(
+        if not await validate_password(
             password=payload.password, hashed_password=user.password
         ):
             raise UnAuthorized
         if user.is_active:
             raise AccountAlreadyVerified
 
-        await user_repository.request_otp(session=session, user=user)
+        async with UnitOfWork(session, commit_on=(AccountDeleted,)):
+            await user_repository.request_otp(session=session, user=user)
         return BaseMessageResponse(message=messages.OTP_RESENT)
 
     @classmethod
@@ -153,12 +291,16 @@ class UserServie:
     ) -> BaseMessageResponse:
         """Resets a new password for the user"""
 
-        user = await user_repository.get_user(email=email, session=session)
-
-        await user_repository.update_data(
-            session=session, data=dict(otp_code=generate_otp_code()), user_id=user.id
+        user = await user_repository.get_user(
+            session=session, profile=UserLoadProfiles.AUTH, email=email
         )
 
+        otp = otp_generator.generate(OTPPurposes.PASSWORD_RESET, previous=user.otp_code)
+        async with UnitOfWork(session):
+            await user_repository.update_data(
+                session=session, data=otp.as_user_fields(), user_id=user.id
+            )
+
         # TODO:Sending new OTP code by email
 
         return BaseMessageResponse(message=messages.PASSWORD_RESET_MESSAGE)
@@ -172,15 +314,15 @@ class UserServie:
         if payload.new_password != payload.re_new_password:
             raise PasswordsDidNotMatch
 
-        user = await user_repository.get_user(
-            email=payload.email, otp_code=payload.otp_code, session=session
-        )
-
-        await user_repository.update_data(
-            session=session,
-            user_id=user.id,
-            data=dict(otp_code=None, password=hash_password(payload.new_password)),
-        )
+        password = await hash_password(payload.new_password)
+        async with UnitOfWork(session):
+            user_id = await user_repository.confirm_password_reset(
+                session=session,
+                email=payload.email,
+                otp_code=payload.otp_code,
+                password=password,
+            )
+        await profile_cache.invalidate(user_id)
 
         return BaseMessageResponse(message=messages.PASSWORD_CHANGED_MESSAGE)
 
@@ -193,18 +335,20 @@ class UserServie:
         if payload.new_password != payload.re_new_password:
             raise PasswordsDidNotMatch
 
-        user = await user_repository.get_user(session=session, id=user_id)
+        async with UnitOfWork(session):
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.AUTH, id=user_id
+            )
 
-        if not validate_password(payload.old_password, user.password):
+        if not await validate_password(payload.old_password, user.password):
             raise PermissionDenied
 
-        user.password = hash_password(payload.new_password)
-
-        await user_repository.update_data(
-            session=session,
-            user_id=user.id,
-            data=dict(password=hash_password(payload.new_password)),
-        )
+        password = await hash_password(payload.new_password)
+        async with UnitOfWork(session):
+            await user_repository.update_data(
+                session=session, user_id=user.id, data=dict(password=password)
+            )
+        await profile_cache.invalidate(user.id)
 
         return BaseMessageResponse(message=messages.PASSWORD_CHANGED_MESSAGE)
 
@@ -214,31 +358,39 @@ class UserServie:
         session: AsyncSession,
         user_id: int,
         payload: UserUpdateSchema | None = None,
-    ):
-        """Updates a user object. Recursively update is going as well, if there is related data."""
-        inspect_table = inspect(cls.model)
+    ) -> UserPatchResponseSchema:
+        """
+        Updates a user object. The current features tree is loaded once and only the
+        difference is written, the submitted features list replaces the current one.
+        Returns the user with the diff summary.
+        """
 
-        related_columns, base_columns = user_repository.get_related_and_base_columns(
-            inspect_table
+        payload_data = payload.model_dump(exclude_unset=True)
+        user = await user_repository.get_user(
+            session=session, profile=UserLoadProfiles.FULL, id=user_id
         )
 
-        base_data_dict = user_repository.preparing_base_fields(base_columns, payload)
-
-        for rel_column in related_columns:
-            if rel_column.key in payload.model_dump(exclude_unset=True):
-                # TODO: user_repository.combine_relations()
-                await user_repository.find_relations(
-                    rel_column.mapper.entity,
-                    GenericSchema(
-                        data=payload.model_dump(exclude_unset=True)[rel_column.key]
-                    ),
-                    session=session,
-                    parent_id=user_id,
-                    parent_backref=rel_column.back_populates,
-                )
-
-        return await user_repository.update_data(
-            session=session, user_id=user_id, data=base_data_dict
+        async with UnitOfWork(session):
+            diff = await user_repository.apply_diff(session, user, payload_data)
+            features_changed = any(
+                rows_diff.has_changes
+                for key, rows_diff in diff.items()
+                if key != User.__tablename__
+            )
+            if features_changed and settings.cache.features_snapshot:
+                await user_repository.sync_features_snapshot(session, [user_id])
+        if any(rows_diff.has_changes for rows_diff in diff.values()):
+            await profile_cache.invalidate(user_id)
+            session.expire_all()
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.FULL, id=user_id
+            )
+
+        return UserPatchResponseSchema(
+            **UserResponseSchema.model_validate(user).model_dump(),
+            diff=ProfileDiffSchema(
+                **{key: asdict(rows_diff) for key, rows_diff in diff.items()}
+            ),
         )
 
     @classmethod
@@ -247,7 +399,9 @@ class UserServie:
     ):
         """Sets/Removes user photo"""
 
-        user = await cls.get_user(session=session, id=user_id)
+        user = await cls.get_user(
+            session=session, profile=UserLoadProfiles.SUMMARY, id=user_id
+        )
 
         filename = generate_filename(file_prefix=user.full_name)
         file_path = get_file_path(
@@ -257,6 +411,8 @@ class UserServie:
             old_path=user.photo,
         )
 
-        await user_repository.update_profile_photo(
-            session=session, user=user, file_path=file_path
-        )
+        async with UnitOfWork(session):
+            await user_repository.update_profile_photo(
+                session=session, user=user, file_path=file_path
+            )
+        await profile_cache.invalidate(user_id)
@@ -7,7 +7,6 @@ import time
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from bcrypt import gensalt, hashpw, checkpw
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,61 +15,84 @@ from src.core.configs import settings
 from src.core.constants import (
     TokenTypes,
     TOKEN_PARTITIONS_NUMBER,
-    OTP_GENERATION_DIVISION,
+    ADMIN_GROUP_ID,
 )
 from src.core.database import get_session
-from src.exceptions.auth_exceptions import InvalidData, UnAuthorized, TokenExpired
+from src.core.hashing import password_hasher
+from src.core.jwt_cache import verified_token_cache
+from src.core.keys import key_manager
+from src.core.revocation import revocation_index
+from src.exceptions.auth_exceptions import (
+    InvalidData,
+    UnAuthorized,
+    TokenExpired,
+    PermissionDenied,
+)
 from src.schemas.auth import TokenResponseScheme
-from src.models import Token
+from src.models import Token, User
 
 auth_scheme = HTTPBearer()
 
 
 def encode_jwt(
     payload: dict,
-    key: str = settings.auth.private_key_path.read_text(),
-    algorithm: str = settings.auth.algorithm,
     expiration_delta: datetime.timedelta = datetime.timedelta(
         minutes=settings.auth.access_token_lifetime
     ),
 ):
-    """Returns encoded JWT token"""
+    """Returns encoded JWT token signed by the active key"""
 
     payload["exp"] = int(time.time() + expiration_delta.total_seconds())
     payload["iat"] = time.time()
 
-    return jwt.encode(payload, key, algorithm)
+    signing_key = key_manager.signing_key
+    return jwt.encode(
+        payload,
+        signing_key.key,
+        signing_key.algorithm,
+        headers={"kid": signing_key.kid},
+    )
 
 
-def decode_jwt(
-    token: str | bytes,
-    key: str = settings.auth.public_key_path.read_text(),
-    algorithm: str = settings.auth.algorithm,
-):
-    """Returns decoded JWT token"""
+def decode_jwt(token: str | bytes):
+    """Returns decoded JWT token, already verified tokens are served from the cache"""
 
-    decoded_data = jwt.decode(token, key, [algorithm])
+    if (decoded_data := verified_token_cache.get(token)) is not None:
+        return decoded_data
+
+    header = jwt.get_unverified_header(token)
+    verification_key = key_manager.verification_key(header.get("kid"))
+    decoded_data = jwt.decode(
+        token, verification_key.key, [verification_key.algorithm]
+    )
     if decoded_data["exp"] < datetime.datetime.now().timestamp():
         raise TokenExpired
 
+    verified_token_cache.set(token, decoded_data)
     return decoded_data
 
 
-def hash_password(password: str) -> bytes:
-    """Returns hashed password."""
-    return hashpw(password.encode(), gensalt())
+async def hash_password(password: str) -> bytes:
+    """Returns hashed password, the hashing runs on the hasher worker pool."""
+    return await password_hasher.hash(password)
 
 
-def validate_password(password: str, hashed_password: bytes) -> bool:
+async def validate_password(password: str, hashed_password: bytes) -> bool:
     """Validates and returns whether the user has typed correct password."""
 
-    return checkpw(password.encode(), hashed_password)
+    return await password_hasher.verify(password, hashed_password)
 
 
-def token_data(user_id: int, token_type: constants.TokenTypes):
+def token_data(
+    user_id: int, token_type: constants.TokenTypes, jti: uuid.UUID | None = None
+):
     """Returns token data"""
 
-    return {"sub": encode_user_id(user_id), "token_type": token_type.value}
+    return {
+        "sub": encode_user_id(user_id),
+        "token_type": token_type.value,
+        "jti": (jti or uuid.uuid4()).hex,
+    }
 
 
 def encode_user_id(user_id: int) -> str:
@@ -89,6 +111,14 @@ def decode_user_id(user_decoded_id: str) -> int:
     return user_id
 
 
+def decode_token_id(decoded_data: dict) -> uuid.UUID:
+    """Returns the token id (`jti` claim) of the decoded token"""
+    try:
+        return uuid.UUID(hex=decoded_data["jti"])
+    except (KeyError, TypeError, ValueError):
+        raise UnAuthorized
+
+
 async def check_token_validity(session: AsyncSession, **kwargs) -> Optional[Token]:
     """Returns is the token expired or no"""
 
@@ -106,17 +136,27 @@ async def validate_authenticated_user_token(
     token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     session: AsyncSession = Depends(get_session),
 ) -> int:
-    """Validates and returns is the token valid"""
+    """
+    Validates and returns is the token valid.
+    In stateless mode the signed `exp` claim is trusted and revocation is checked
+    against the in-process index, so the database is not touched while the index is fresh.
+    """
     try:
-        await check_token_validity(
-            session=session, access_token=token.credentials, expired=False
-        )
-
         data = decode_jwt(token.credentials)
 
         if data["token_type"] != TokenTypes.ACCESS.value:
             raise InvalidData
 
+        token_id = decode_token_id(data)
+        if settings.auth.stateless_validation:
+            await revocation_index.ensure_fresh(session)
+            if revocation_index.is_revoked(token_id):
+                raise UnAuthorized
+        else:
+            await check_token_validity(
+                session=session, access_jti=token_id, expired=False
+            )
+
         user_id = decode_user_id(data["sub"])
 
         return user_id
@@ -125,19 +165,34 @@ async def validate_authenticated_user_token(
         raise UnAuthorized
 
 
-def generate_otp_code() -> str:
-    """Generated OTP code for any purpose"""
-    return f"{uuid.uuid4().int % OTP_GENERATION_DIVISION}"
+async def validate_admin_user(
+    user_id: int = Depends(validate_authenticated_user_token),
+    session: AsyncSession = Depends(get_session),
+) -> int:
+    """Validates that the authenticated user is an active admin and returns its id"""
+
+    stmt = select(User.group_id).where(User.id == user_id, User.is_active.is_(True))
+    if await session.scalar(stmt) != ADMIN_GROUP_ID:
+        raise PermissionDenied
+    return user_id
 
 
-def create_refresh_and_access_tokens(user_id: int) -> TokenResponseScheme:
+def create_refresh_and_access_tokens(
+    user_id: int,
+    access_jti: uuid.UUID | None = None,
+    refresh_jti: uuid.UUID | None = None,
+) -> TokenResponseScheme:
     """Returns a couple of access and refresh token"""
 
     access_token: str = encode_jwt(
-        payload=token_data(user_id=user_id, token_type=constants.TokenTypes.ACCESS)
+        payload=token_data(
+            user_id=user_id, token_type=constants.TokenTypes.ACCESS, jti=access_jti
+        )
     )
     refresh_token: str = encode_jwt(
-        payload=token_data(user_id=user_id, token_type=constants.TokenTypes.REFRESH),
+        payload=token_data(
+            user_id=user_id, token_type=constants.TokenTypes.REFRESH, jti=refresh_jti
+        ),
         expiration_delta=datetime.timedelta(days=settings.auth.refresh_token_lifetime),
     )
     return TokenResponseScheme(
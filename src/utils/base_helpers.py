@@ -71,3 +71,8 @@ def check_content_type(content_types: list):
         return wrapped
 
     return inner
+
+
+def normalize_email(email: str) -> str:
+    """Returns the stored form of an email, emails are unique case-insensitively"""
+    return email.strip().lower()
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator
+
+from src.core.constants import DataFormats
+
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def _ndjson_line(record: dict) -> str:
+    return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+
+async def serialize_records(
+    records: AsyncIterable[dict], data_format: DataFormats
+) -> AsyncIterator[str]:
+    """
+    Serializes the records into NDJSON lines or CSV rows (with a header),
+    nested values of CSV rows are written as JSON.
+    """
+
+    if data_format is DataFormats.NDJSON:
+        async for record in records:
+            yield _ndjson_line(record)
+        return
+
+    buffer = io.StringIO()
+    writer = None
+    async for record in records:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(record))
+            writer.writeheader()
+        writer.writerow(
+            {
+                key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                for key, value in record.items()
+            }
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def buffered(
+    chunks: AsyncIterable[str], size: int = EXPORT_BUFFER_SIZE
+) -> AsyncIterator[str]:
+    """Joins small chunks, so a streamed response is not sent line by line"""
+
+    parts, length = [], 0
+    async for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield "".join(parts)
@@ -0,0 +1,44 @@
+import csv
+import itertools
+import json
+from typing import Iterable, Iterator
+
+from src import messages
+from src.core.constants import DataFormats
+
+
+def iter_records(
+    lines: Iterable[str], data_format: DataFormats
+) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Lazily parses CSV (with a header) or NDJSON lines,
+    yields (line number, record, error) for every data line.
+    """
+
+    if data_format is DataFormats.CSV:
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        if isinstance(record, dict):
+            yield line_number, record, None
+        else:
+            yield line_number, None, messages.INVALID_RECORD.format(
+                data_format=data_format.value
+            )
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Splits the iterable into lists of `size` items without reading it ahead"""
+
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
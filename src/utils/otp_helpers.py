@@ -0,0 +1,54 @@
+import datetime
+import secrets
+from dataclasses import dataclass
+
+from src.core.configs import settings
+from src.core.constants import OTPPurposes
+
+
+@dataclass(frozen=True)
+class OTPCode:
+    code: str
+    purpose: OTPPurposes
+    expires_at: datetime.datetime
+
+    def as_user_fields(self) -> dict:
+        """Returns the user columns which hold the OTP state"""
+        return dict(
+            otp_code=self.code,
+            otp_purpose=self.purpose.value,
+            otp_expires_at=self.expires_at,
+        )
+
+
+class OTPGenerator:
+    """
+    Generates OTP codes with `secrets`.
+    A code is stored on the user row, so it only has to be unique per email and purpose,
+    which means it must differ from the code it replaces.
+    """
+
+    def __init__(self, length: int, lifetime: int):
+        self.length = length
+        self.lifetime = datetime.timedelta(minutes=lifetime)
+
+    def _random_code(self) -> str:
+        return f"{secrets.randbelow(10 ** self.length):0{self.length}d}"
+
+    def generate(self, purpose: OTPPurposes, previous: str | None = None) -> OTPCode:
+        """Returns a new OTP code for the purpose, never equal to the previous one"""
+
+        code = self._random_code()
+        while code == previous:
+            code = self._random_code()
+
+        return OTPCode(
+            code=code,
+            purpose=purpose,
+            expires_at=datetime.datetime.utcnow() + self.lifetime,
+        )
+
+
+otp_generator = OTPGenerator(
+    length=settings.auth.otp_length, lifetime=settings.auth.otp_lifetime
+)
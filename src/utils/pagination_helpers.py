@@ -0,0 +1,24 @@
+import base64
+import binascii
+import datetime
+
+from src.exceptions.base_exceptions import InvalidCursor
+
+
+def encode_cursor(created_at: datetime.datetime, object_id: int) -> str:
+    """Encodes the keyset position of the last row of a page"""
+
+    position = f"{created_at.isoformat()}|{object_id}".encode()
+    return base64.urlsafe_b64encode(position).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """Returns the (created_at, id) position of the cursor"""
+
+    try:
+        created_at, object_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.datetime.fromisoformat(created_at), int(object_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor()
@@ -1,3 +1,5 @@
+import json
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
@@ -5,10 +7,12 @@ import asyncio
 
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 from src.core.database import get_session, BaseModel
-from src.core.configs import settings
+from src.core.configs import BASE_DIR, settings
+from src.models import UserGroup
 from main import app
 
 engine_test = create_async_engine(settings.db.db_test_url, poolclass=NullPool)
@@ -46,6 +50,15 @@ async def prepare_database():
         await conn.run_sync(BaseModel.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True, scope="session")
+async def seed_user_groups(prepare_database):
+    """Seeds the user groups the migrations create from `src/fixtures/usergroup.json`"""
+    with open(BASE_DIR / "src" / "fixtures" / "usergroup.json") as groups_source:
+        user_groups = json.load(groups_source)
+    async with engine_test.begin() as conn:
+        await conn.execute(insert(UserGroup), user_groups)
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for each test case."""
@@ -59,6 +72,26 @@ def event_loop():
     res._close()
 
 
+@pytest.fixture(scope="function")
+def collect_statements():
+    """Returns a context manager which collects the SQL statements sent inside it"""
+
+    @contextmanager
+    def collect():
+        statements = []
+
+        def collector(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine_test.sync_engine, "before_cursor_execute", collector)
+        try:
+            yield statements
+        finally:
+            event.remove(engine_test.sync_engine, "before_cursor_execute", collector)
+
+    return collect
+
+
 client = TestClient(app)
 
 
@@ -1,9 +1,15 @@
+from typing import Awaitable, Callable
+
+import pytest
 import pytest_asyncio
 from src.models import User
+from src.repositories import user_repository
 from src.services import user_service
 from src.schemas import UserCreateSchema
 from tests.conftest import async_session_maker
 
+USER_PASSWORD = "Senior1234!"
+
 
 @pytest_asyncio.fixture(scope="function")
 async def user_fixture() -> User:
@@ -12,9 +18,32 @@ async def user_fixture() -> User:
             first_name="Test",
             last_name="User",
             email="test@mail.ru",
-            password="Senior1234!",
+            password=USER_PASSWORD,
         )
         await user_service.create_user(user_schema, session=session)
         stmt = await user_service.get_user(email=user_schema.email, session=session)
 
         return stmt
+
+
+@pytest.fixture(scope="function")
+def create_user() -> Callable[..., Awaitable[User]]:
+    """Returns a factory which registers a user by email and returns it"""
+
+    async def factory(email: str, **fields) -> User:
+        async with async_session_maker() as session:
+            await user_service.create_user(
+                UserCreateSchema(
+                    **{
+                        "first_name": "Test",
+                        "last_name": "User",
+                        "password": USER_PASSWORD,
+                        **fields,
+                        "email": email,
+                    }
+                ),
+                session=session,
+            )
+            return await user_repository.get_user(session=session, email=email)
+
+    return factory
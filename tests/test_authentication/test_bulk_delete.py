@@ -0,0 +1,131 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.models import (
+    Permission,
+    User,
+    UserGroup,
+    UserRelatedFeatures,
+    UserRelatedFeatureValue,
+)
+from src.repositories import user_group_repository, user_repository
+from src.repositories._metadata import get_model_metadata
+from src.schemas.user import UserUpdateSchema
+from src.services import user_service
+from tests.conftest import async_session_maker
+
+FEATURES_COUNT = 50
+VALUES_COUNT = 40
+
+
+@pytest.fixture
+def create_user_with_features(create_user):
+    async def create(email: str) -> int:
+        user = await create_user(email)
+        async with async_session_maker() as session:
+            await user_service.patch_user(
+                session=session,
+                user_id=user.id,
+                payload=UserUpdateSchema(
+                    features=[
+                        {
+                            "title": f"feature {feature}",
+                            "values": [
+                                {"value": f"value {value}"}
+                                for value in range(VALUES_COUNT)
+                            ],
+                        }
+                        for feature in range(FEATURES_COUNT)
+                    ]
+                ),
+            )
+        return user.id
+
+    return create
+
+
+def _count_deletes(statements: list[str]) -> int:
+    return sum(
+        statement.lstrip().upper().startswith("DELETE") for statement in statements
+    )
+
+
+async def test_delete_user_with_features_by_constant_statements(
+    create_user_with_features, collect_statements
+):
+    user_id = await create_user_with_features("bulk_delete@mail.ru")
+
+    with collect_statements() as statements:
+        async with async_session_maker() as session:
+            assert await user_repository.delete_user(session, user_id)
+            await session.commit()
+
+    assert _count_deletes(statements) == 3
+
+    async with async_session_maker() as session:
+        assert not await session.scalar(select(User.id).where(User.id == user_id))
+        assert not await session.scalar(
+            select(func.count(UserRelatedFeatures.id)).where(
+                UserRelatedFeatures.user_id == user_id
+            )
+        )
+
+
+async def test_delete_related_objects_returns_ids(create_user_with_features):
+    user_id = await create_user_with_features("bulk_delete_related@mail.ru")
+
+    async with async_session_maker() as session:
+        deleted_ids = await user_repository.delete_related_objects(
+            UserRelatedFeatures, user_id, User, session, returning=True
+        )
+        await session.commit()
+
+        assert len(deleted_ids) == FEATURES_COUNT
+        assert not await session.scalar(
+            select(func.count(UserRelatedFeatureValue.id)).where(
+                UserRelatedFeatureValue.feature_id.in_(deleted_ids)
+            )
+        )
+        assert not await user_repository.find_drifted_snapshots(session, [user_id])
+
+
+def test_parent_column_is_taken_from_the_foreign_key():
+    relations = {
+        relation.key: relation
+        for relation in get_model_metadata(UserGroup).child_relations
+    }
+
+    assert relations["users"].parent_column == "group_id"
+    assert relations["permissions"].parent_column == "user_group_id"
+
+
+async def test_delete_group_with_its_permission_and_users(create_user):
+    email = "bulk_delete_group@mail.ru"
+    async with async_session_maker() as session:
+        group_id = 100
+        session.add(UserGroup(id=group_id, title="Temporary"))
+        await session.flush()
+        session.add(Permission(user_group_id=group_id, policies={}))
+        await session.commit()
+
+    user_id = (await create_user(email, group_id=group_id)).id
+    async with async_session_maker() as session:
+        await user_service.patch_user(
+            session=session,
+            user_id=user_id,
+            payload=UserUpdateSchema(
+                features=[{"title": "languages", "values": [{"value": "en"}]}]
+            ),
+        )
+
+    async with async_session_maker() as session:
+        deleted_ids = await user_group_repository.delete_objects(
+            session, UserGroup, UserGroup.id == group_id, returning=True
+        )
+        await session.commit()
+
+        assert deleted_ids == [group_id]
+        assert not await session.scalar(
+            select(Permission.id).where(Permission.user_group_id == group_id)
+        )
+        assert not await session.scalar(select(User.id).where(User.id == user_id))
@@ -0,0 +1,21 @@
+import pytest
+from fastapi.exceptions import HTTPException
+
+from src.exceptions.auth_exceptions import EmailDuplication
+from src.repositories import user_repository
+from tests.conftest import async_session_maker
+
+
+async def test_email_is_case_insensitive(create_user):
+    await create_user("Mixed.Case@Mail.ru")
+    async with async_session_maker() as session:
+        user = await user_repository.get_user(
+            session=session, email="MIXED.case@mail.RU"
+        )
+
+    assert user.email == "mixed.case@mail.ru"
+
+    with pytest.raises(HTTPException) as error:
+        await create_user("mixed.CASE@mail.ru")
+
+    assert error.value is EmailDuplication
@@ -0,0 +1,44 @@
+from src.core.constants import FeatureMatchModes
+from src.schemas.user import UserUpdateSchema
+from src.services import user_service
+from tests.conftest import async_session_maker
+
+SPECIALTIES = ("cardiology", "cardiac surgery", "neurology")
+
+
+async def _search(match: FeatureMatchModes, value: str, **kwargs):
+    async with async_session_maker() as session:
+        return await user_service.search_by_feature(
+            session=session, title="specialty", value=value, match=match, **kwargs
+        )
+
+
+async def test_search_matches_values_by_mode(create_user):
+    user_ids = []
+    for index, specialty in enumerate(SPECIALTIES):
+        user_id = (await create_user(f"specialist_{index}@mail.ru")).id
+        async with async_session_maker() as session:
+            await user_service.patch_user(
+                session=session,
+                user_id=user_id,
+                payload=UserUpdateSchema(
+                    features=[{"title": "specialty", "values": [{"value": specialty}]}]
+                ),
+            )
+        user_ids.append(user_id)
+
+    exact = await _search(FeatureMatchModes.EXACT, "cardiology")
+    assert exact.user_ids == user_ids[:1]
+
+    first_page = await _search(FeatureMatchModes.PREFIX, "cardi", limit=1)
+    assert first_page.user_ids == user_ids[:1]
+    assert first_page.next_cursor == user_ids[0]
+
+    second_page = await _search(
+        FeatureMatchModes.PREFIX, "cardi", limit=1, cursor=first_page.next_cursor
+    )
+    assert second_page.user_ids == user_ids[1:2]
+    assert second_page.next_cursor is None
+
+    fuzzy = await _search(FeatureMatchModes.FUZZY, "cardiolgy")
+    assert fuzzy.user_ids == user_ids[:1]
@@ -0,0 +1,53 @@
+import json
+
+from sqlalchemy import select, update
+
+from src.models import User
+from src.schemas.user import UserUpdateSchema
+from src.services import profile_snapshot_service, user_service
+from tests.conftest import async_session_maker
+
+
+async def test_profile_is_read_from_the_synced_snapshot(
+    create_user, collect_statements
+):
+    user_id = (await create_user("snapshot@mail.ru")).id
+    async with async_session_maker() as session:
+        patched = await user_service.patch_user(
+            session=session,
+            user_id=user_id,
+            payload=UserUpdateSchema(
+                features=[{"title": "languages", "values": [{"value": "en"}]}]
+            ),
+        )
+
+    with collect_statements() as statements:
+        async with async_session_maker() as session:
+            profile = json.loads(
+                await user_service.get_profile(session=session, user_id=user_id)
+            )
+
+    assert len(statements) == 1
+    assert profile["features"] == patched.model_dump()["features"]
+
+
+async def test_drifted_snapshot_is_rebuilt(create_user):
+    user_id = (await create_user("drifted_snapshot@mail.ru")).id
+    async with async_session_maker() as session:
+        drifted_before = (await profile_snapshot_service.check(session))["drifted"]
+        await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(features_snapshot=[{"id": 0, "title": "stale", "values": []}])
+        )
+        await session.commit()
+
+        # the test database is shared, only the drift of this user is asserted
+        report = await profile_snapshot_service.check(session)
+        assert report["drifted"] == drifted_before + 1
+        assert await profile_snapshot_service.rebuild(session) >= 1
+        assert (await profile_snapshot_service.check(session))["drifted"] == 0
+        snapshot = await session.scalar(
+            select(User.features_snapshot).where(User.id == user_id)
+        )
+        assert snapshot == []
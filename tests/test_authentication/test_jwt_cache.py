@@ -0,0 +1,49 @@
+import time
+import uuid
+
+from src.core.jwt_cache import VerifiedTokenCache
+
+
+def _claims(lifetime: int = 60) -> dict:
+    return {"jti": uuid.uuid4().hex, "exp": int(time.time() + lifetime)}
+
+
+def test_cache_hit_and_miss_counters():
+    cache = VerifiedTokenCache(maxsize=10)
+    claims = _claims()
+
+    assert cache.get("token") is None
+
+    cache.set("token", claims)
+
+    assert cache.get("token") == claims
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_token_is_evicted():
+    cache = VerifiedTokenCache(maxsize=10)
+    cache.set("token", _claims(lifetime=-1))
+
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_token_is_evicted():
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.set("first", _claims())
+    cache.set("second", _claims())
+    cache.get("first")
+    cache.set("third", _claims())
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+
+
+def test_revoked_token_is_evicted():
+    cache = VerifiedTokenCache(maxsize=10)
+    claims = _claims()
+    cache.set("token", claims)
+
+    cache.invalidate(uuid.UUID(hex=claims["jti"]))
+
+    assert cache.get("token") is None
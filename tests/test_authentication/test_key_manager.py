@@ -0,0 +1,174 @@
+import json
+import os
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+
+from fastapi.exceptions import HTTPException
+
+from src.core.keys import KeyManager
+from src.exceptions.auth_exceptions import UnAuthorized
+from src.routers import well_known
+from src.utils import auth_helpers
+
+
+PRIVATE_KEY_FACTORIES = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def _write_key_pair(private_key_path, public_key_path, algorithm: str = "ES256"):
+    private_key = PRIVATE_KEY_FACTORIES[algorithm]()
+    private_key_path.write_bytes(
+        private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    )
+    public_key_path.write_bytes(
+        private_key.public_key().public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        )
+    )
+
+
+def _key_manager(tmp_path, algorithm: str = "ES256") -> KeyManager:
+    return KeyManager(
+        private_key_path=tmp_path / "private.pem",
+        public_key_path=tmp_path / "public.pem",
+        verification_keys_dir=tmp_path / "verification",
+        algorithm=algorithm,
+        reload_interval=0,
+    )
+
+
+def test_token_is_tagged_with_the_signing_kid(tmp_path, monkeypatch):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem")
+    manager = _key_manager(tmp_path)
+    monkeypatch.setattr(auth_helpers, "key_manager", manager)
+
+    token = auth_helpers.encode_jwt({"sub": "kid"})
+
+    assert jwt.get_unverified_header(token)["kid"] == manager.signing_key.kid
+    assert auth_helpers.decode_jwt(token)["sub"] == "kid"
+
+
+def test_old_key_verifies_during_rotation(tmp_path, monkeypatch):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem")
+    manager = _key_manager(tmp_path)
+    monkeypatch.setattr(auth_helpers, "key_manager", manager)
+    old_kid = manager.signing_key.kid
+    old_token = auth_helpers.encode_jwt({"sub": "old"})
+
+    (tmp_path / "verification").mkdir()
+    os.replace(tmp_path / "public.pem", tmp_path / "verification" / "old.pem")
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem")
+    manager.load()
+    new_token = auth_helpers.encode_jwt({"sub": "new"})
+
+    assert manager.signing_key.kid != old_kid
+    assert jwt.get_unverified_header(new_token)["kid"] == manager.signing_key.kid
+    assert auth_helpers.decode_jwt(old_token)["sub"] == "old"
+    assert auth_helpers.decode_jwt(new_token)["sub"] == "new"
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_token_is_signed_and_verified_by_algorithm(tmp_path, monkeypatch, algorithm):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem", algorithm)
+    manager = _key_manager(tmp_path, algorithm)
+    monkeypatch.setattr(auth_helpers, "key_manager", manager)
+
+    token = auth_helpers.encode_jwt({"sub": algorithm})
+
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert manager.verification_key(manager.signing_key.kid).algorithm == algorithm
+    assert auth_helpers.decode_jwt(token)["sub"] == algorithm
+
+
+@pytest.mark.parametrize(
+    "key_algorithm, algorithm",
+    [("ES256", "EdDSA"), ("EdDSA", "RS256"), ("RS256", "ES256")],
+)
+def test_mismatched_signing_key_is_refused(tmp_path, key_algorithm, algorithm):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem", key_algorithm)
+    manager = _key_manager(tmp_path, algorithm)
+
+    with pytest.raises(ValueError, match=f"is not a `{algorithm}` key"):
+        manager.load()
+
+
+def test_unsupported_algorithm_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported signing algorithm"):
+        _key_manager(tmp_path, "HS256")
+
+
+def test_unknown_kid_is_refused(tmp_path, monkeypatch):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem")
+    manager = _key_manager(tmp_path)
+    monkeypatch.setattr(auth_helpers, "key_manager", manager)
+    signing_key = manager.signing_key
+    token = jwt.encode(
+        {"sub": "unknown", "exp": 2**31},
+        signing_key.key,
+        signing_key.algorithm,
+        headers={"kid": "unknown"},
+    )
+
+    with pytest.raises(HTTPException) as error:
+        auth_helpers.decode_jwt(token)
+
+    assert error.value is UnAuthorized
+
+
+async def test_jwks_is_served_with_cache_headers(tmp_path, monkeypatch, async_client):
+    _write_key_pair(tmp_path / "private.pem", tmp_path / "public.pem")
+    manager = _key_manager(tmp_path)
+    monkeypatch.setattr(well_known, "key_manager", manager)
+
+    response = await async_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert [key["kid"] for key in json.loads(response.content)["keys"]] == [
+        manager.signing_key.kid
+    ]
+
+    cached = await async_client.get(
+        "/.well-known/jwks.json",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert cached.content == b""
+
+
+def test_failed_reload_keeps_the_previous_keys(tmp_path):
+    private_key_path = tmp_path / "private.pem"
+    public_key_path = tmp_path / "public.pem"
+    _write_key_pair(private_key_path, public_key_path)
+    manager = KeyManager(
+        private_key_path=private_key_path,
+        public_key_path=public_key_path,
+        verification_keys_dir=tmp_path / "verification",
+        algorithm="ES256",
+        reload_interval=0,
+    )
+    signing_key = manager.signing_key
+
+    # only the private key of the next pair is in place yet
+    _write_key_pair(private_key_path, tmp_path / "next-public.pem")
+    os.utime(private_key_path, ns=(0, 0))
+
+    assert manager.signing_key == signing_key
+    assert manager.verification_key(signing_key.kid).key is not None
+
+    os.replace(tmp_path / "next-public.pem", public_key_path)
+
+    assert manager.signing_key != signing_key
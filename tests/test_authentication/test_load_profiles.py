@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from src.core.constants import UserLoadProfiles
+from src.repositories import user_repository
+from tests.conftest import async_session_maker
+
+
+async def test_auth_profile_is_one_narrow_query(create_user, collect_statements):
+    email = "auth_profile@mail.ru"
+    await create_user(email)
+
+    with collect_statements() as statements:
+        async with async_session_maker() as session:
+            user = await user_repository.get_user(
+                session=session, profile=UserLoadProfiles.AUTH, email=email
+            )
+
+    assert len(statements) == 1
+    assert "first_name" not in statements[0]
+    assert user.password and user.otp_code
+    with pytest.raises(InvalidRequestError):
+        user.features
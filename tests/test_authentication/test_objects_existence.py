@@ -0,0 +1,47 @@
+import pytest
+from fastapi.exceptions import HTTPException
+
+from src import messages
+from src.schemas.user import UserUpdateSchema
+from src.services import user_service
+from tests.conftest import async_session_maker
+
+
+@pytest.fixture
+def create_user_with_feature(create_user):
+    async def create(email: str) -> tuple[int, int]:
+        user = await create_user(email)
+        async with async_session_maker() as session:
+            user = await user_service.patch_user(
+                session=session,
+                user_id=user.id,
+                payload=UserUpdateSchema(features=[{"title": "language"}]),
+            )
+        return user.id, user.features[0].id
+
+    return create
+
+
+async def test_missing_and_foreign_ids_are_reported_at_once(create_user_with_feature):
+    user_id, own_feature_id = await create_user_with_feature("owner@mail.ru")
+    _, foreign_feature_id = await create_user_with_feature("stranger@mail.ru")
+    missing_feature_id = foreign_feature_id + 1000
+
+    async with async_session_maker() as session:
+        with pytest.raises(HTTPException) as e:
+            await user_service.patch_user(
+                session=session,
+                user_id=user_id,
+                payload=UserUpdateSchema(
+                    features=[
+                        {"id": own_feature_id, "title": "languages"},
+                        {"id": foreign_feature_id, "title": "stolen"},
+                        {"id": missing_feature_id, "title": "missing"},
+                    ]
+                ),
+            )
+
+    assert e.value.detail == messages.OBJECTS_DO_NOT_EXISTS.format(
+        model="UserRelatedFeatures",
+        ids=f"{foreign_feature_id}, {missing_feature_id}",
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import datetime
+
+from sqlalchemy import delete, select
+
+from src import messages
+from src.core.constants import OTPPurposes
+from src.core.hashing import password_hasher
+from src.models import User
+from src.schemas import UserCreateSchema
+from src.schemas.base import BaseMessageResponse
+from src.services import user_service
+from src.utils.otp_helpers import otp_generator
+from tests.conftest import async_session_maker
+
+PARALLEL_USERS_COUNT = 2000
+PARALLEL_SESSIONS_LIMIT = 20
+
+
+def test_otp_code_format():
+    otp = otp_generator.generate(OTPPurposes.VERIFICATION)
+
+    assert len(otp.code) == otp_generator.length
+    assert otp.code.isdigit()
+    assert otp.expires_at > datetime.datetime.utcnow()
+
+
+def test_otp_code_differs_from_previous():
+    previous = otp_generator.generate(OTPPurposes.PASSWORD_RESET).code
+
+    for _ in range(1000):
+        assert otp_generator.generate(
+            OTPPurposes.PASSWORD_RESET, previous=previous
+        ).code != previous
+
+
+async def test_parallel_registration(monkeypatch):
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    semaphore = asyncio.Semaphore(PARALLEL_SESSIONS_LIMIT)
+
+    async def register(number: int):
+        async with semaphore, async_session_maker() as session:
+            return await user_service.create_user(
+                data=UserCreateSchema(
+                    first_name="Parallel",
+                    last_name="User",
+                    email=f"parallel_{number}@mail.ru",
+                    password="Senior1234!",
+                ),
+                session=session,
+            )
+
+    responses = await asyncio.gather(
+        *(register(number) for number in range(PARALLEL_USERS_COUNT))
+    )
+
+    assert responses == [
+        BaseMessageResponse(message=messages.USER_CREATED_SUCCESSFULLY)
+    ] * PARALLEL_USERS_COUNT
+
+    async with async_session_maker() as session:
+        users_filter = User.email.like("parallel_%@mail.ru")
+        result = await session.execute(
+            select(User.otp_code, User.otp_purpose).where(users_filter)
+        )
+        rows = result.all()
+
+        assert len(rows) == PARALLEL_USERS_COUNT
+        assert all(
+            len(otp_code) == otp_generator.length
+            and otp_purpose == OTPPurposes.VERIFICATION.value
+            for otp_code, otp_purpose in rows
+        )
+
+        await session.execute(delete(User).where(users_filter))
+        await session.commit()
@@ -0,0 +1,91 @@
+import asyncio
+
+from fastapi.exceptions import HTTPException
+
+from src import messages
+from src.core.constants import OTP_MAX_ATTEMPTS
+from src.core.hashing import password_hasher
+from src.schemas.auth import (
+    AccountVerificationScheme,
+    LoginSchema,
+    ResetPasswordConfirmScheme,
+)
+from src.services import user_service
+from tests.conftest import async_session_maker
+from tests.fixtures.fixture_user import USER_PASSWORD
+
+PARALLEL_ATTEMPTS_COUNT = 20
+
+
+async def _details(coroutine_factory) -> list[str]:
+    """Runs the calls in parallel and returns their response messages"""
+
+    async def call():
+        async with async_session_maker() as session:
+            try:
+                return (await coroutine_factory(session)).message
+            except HTTPException as e:
+                return e.detail
+
+    return await asyncio.gather(*(call() for _ in range(PARALLEL_ATTEMPTS_COUNT)))
+
+
+async def test_parallel_wrong_otp_attempts(create_user):
+    email = "parallel_attempts@mail.ru"
+    await create_user(email)
+
+    details = await _details(
+        lambda session: user_service.verify_account(
+            data=AccountVerificationScheme(email=email, otp_code="wrong"),
+            session=session,
+        )
+    )
+
+    assert details.count(messages.INVALID_OTP_CODE.format(number=2)) == 1
+    assert details.count(messages.INVALID_OTP_CODE.format(number=1)) == 1
+    assert details.count(messages.ACCOUNT_DELETED) == 1
+    assert details.count(messages.USER_DOES_NOT_EXISTS) == (
+        PARALLEL_ATTEMPTS_COUNT - OTP_MAX_ATTEMPTS
+    )
+
+
+async def test_parallel_otp_requests(create_user):
+    email = "parallel_requests@mail.ru"
+    await create_user(email)
+
+    details = await _details(
+        lambda session: user_service.request_otp(
+            payload=LoginSchema(email=email, password=USER_PASSWORD),
+            session=session,
+        )
+    )
+
+    assert details.count(messages.OTP_RESENT) == OTP_MAX_ATTEMPTS - 1
+    assert details.count(messages.ACCOUNT_DELETED) == 1
+    assert details.count(messages.USER_DOES_NOT_EXISTS) == (
+        PARALLEL_ATTEMPTS_COUNT - OTP_MAX_ATTEMPTS
+    )
+
+
+async def test_parallel_password_reset_confirmations(monkeypatch, create_user):
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    email = "parallel_reset@mail.ru"
+    user = await create_user(email)
+    async with async_session_maker() as session:
+        await user_service.reset_password(email=email, session=session)
+        otp_code = (await user_service.get_user(session=session, id=user.id)).otp_code
+
+    details = await _details(
+        lambda session: user_service.reset_password_confirm(
+            payload=ResetPasswordConfirmScheme(
+                email=email,
+                otp_code=otp_code,
+                new_password="Junior1234!",
+                re_new_password="Junior1234!",
+            ),
+            session=session,
+        )
+    )
+
+    assert details.count(messages.PASSWORD_CHANGED_MESSAGE) == 1
+    assert details.count(messages.USER_DOES_NOT_EXISTS) == PARALLEL_ATTEMPTS_COUNT - 1
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.core.hashing import PROCESS_EXECUTOR, PasswordHasher
+from src.exceptions.base_exceptions import ServiceIsBusy
+
+PASSWORD = "Senior1234!"
+
+
+async def test_jobs_over_the_queue_depth_are_rejected():
+    hasher = PasswordHasher(max_workers=1, max_queue_depth=1, rounds=4)
+    try:
+        running = asyncio.create_task(hasher.hash(PASSWORD))
+        await asyncio.sleep(0)
+
+        assert hasher.metrics.in_flight == 1
+        with pytest.raises(ServiceIsBusy):
+            await hasher.hash(PASSWORD)
+
+        await running
+    finally:
+        hasher.shutdown()
+
+    metrics = hasher.metrics.snapshot()
+    assert metrics["rejected"] == 1
+    assert metrics["submitted"] == metrics["completed"] == 1
+    assert metrics["in_flight"] == 0
+    assert metrics["max_in_flight"] == 1
+
+
+async def test_failed_jobs_are_counted():
+    hasher = PasswordHasher(max_workers=1, rounds=4)
+    try:
+        with pytest.raises(ValueError):
+            await hasher.verify(PASSWORD, b"not a bcrypt hash")
+    finally:
+        hasher.shutdown()
+
+    assert hasher.metrics.failed == 1
+    assert hasher.metrics.in_flight == 0
+
+
+async def test_process_pool_hashes_and_verifies():
+    hasher = PasswordHasher(executor=PROCESS_EXECUTOR, max_workers=1, rounds=4)
+    try:
+        hashed = await hasher.hash(PASSWORD)
+
+        assert await hasher.verify(PASSWORD, hashed)
+        assert not await hasher.verify("Wrong1234!", hashed)
+    finally:
+        hasher.shutdown()
+
+    assert hasher._executor is None
+    assert hasher.metrics.completed == 3
+    assert hasher.metrics.snapshot()["avg_seconds"] > 0
+
+
+def test_unknown_executor_is_refused():
+    with pytest.raises(ValueError):
+        PasswordHasher(executor="fiber")
@@ -0,0 +1,127 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import profile_cache as profile_cache_module
+from src.core.profile_cache import (
+    LocalSharedStore,
+    MemoryBackend,
+    ProfileCache,
+    SharedBackend,
+)
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    cache = ProfileCache(MemoryBackend(maxsize=2, ttl=60))
+    await cache.set(1, b'{"id":1}', 0)
+    await cache.set(2, b'{"id":2}', 0)
+    await cache.lookup(1)
+    await cache.set(3, b'{"id":3}', 0)
+
+    assert await cache.lookup(2) == (None, 0)
+    assert await cache.lookup(1) == (b'{"id":1}', 0)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["memory_bytes"] == len(b'{"id":1}') + len(b'{"id":3}')
+
+
+async def test_memory_backend_entries_expire():
+    backend = MemoryBackend(maxsize=10, ttl=60)
+    cache = ProfileCache(backend)
+    await cache.set(1, b'{"id":1}', 0)
+    backend._entries["1"] = (time.monotonic() - 1, 0, b'{"id":1}')
+
+    assert await cache.lookup(1) == (None, 0)
+    assert cache.stats()["memory_bytes"] == 0
+
+
+async def test_shared_backend_invalidation_is_seen_by_every_worker():
+    store = LocalSharedStore()
+    first_worker = ProfileCache(SharedBackend(store, ttl=60))
+    second_worker = ProfileCache(SharedBackend(store, ttl=60))
+    await first_worker.set(1, b'{"id":1}', 0)
+
+    assert await second_worker.lookup(1) == (b'{"id":1}', 0)
+
+    await first_worker.invalidate(1)
+
+    assert await second_worker.lookup(1) == (None, 1)
+    assert second_worker.stats()["hit_ratio"] == 0.5
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        lambda: MemoryBackend(maxsize=10, ttl=60),
+        lambda: SharedBackend(LocalSharedStore(), ttl=60),
+    ],
+)
+async def test_profile_read_before_invalidation_is_not_stored(backend):
+    cache = ProfileCache(backend())
+    _, version = await cache.lookup(1)
+
+    await cache.invalidate(1)
+    await cache.set(1, b'{"id":1,"first_name":"stale"}', version)
+
+    content, version = await cache.lookup(1)
+    assert content is None
+    await cache.set(1, b'{"id":1,"first_name":"fresh"}', version)
+    assert await cache.lookup(1) == (b'{"id":1,"first_name":"fresh"}', version)
+
+
+async def test_memory_backend_drops_versions_after_the_ttl():
+    backend = MemoryBackend(maxsize=10, ttl=60)
+    cache = ProfileCache(backend)
+    await cache.invalidate(1)
+    await cache.invalidate(2)
+
+    assert cache.stats()["versions"] == 2
+
+    backend._versions["1"] = (time.monotonic() - 61, 1)
+    backend._versions.move_to_end("1", last=False)
+    await cache.invalidate(3)
+
+    assert cache.stats()["versions"] == 2
+    assert await cache.lookup(1) == (None, 0)
+    assert await cache.lookup(2) == (None, 1)
+
+
+async def test_shared_backend_version_key_expires():
+    store = LocalSharedStore()
+    cache = ProfileCache(SharedBackend(store, ttl=60))
+    await cache.invalidate(1)
+
+    expires_at, value = store._values["profile:1:version"]
+    assert value == b"1"
+    assert expires_at == pytest.approx(time.monotonic() + 60, abs=1)
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        lambda: MemoryBackend(maxsize=10, ttl=60),
+        lambda: SharedBackend(LocalSharedStore(), ttl=60),
+    ],
+)
+async def test_entry_outliving_the_version_bump_is_not_served_again(
+    monkeypatch, backend
+):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        profile_cache_module, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    cache = ProfileCache(backend())
+
+    await cache.invalidate(1)
+    clock.now += 30
+    _, version = await cache.lookup(1)
+    await cache.set(1, b'{"id":1,"first_name":"old"}', version)
+
+    # past the ttl of the bump, the entry stored after it is still alive
+    clock.now += 40
+    content, version = await cache.lookup(1)
+    if content is None:
+        await cache.set(1, b'{"id":1,"first_name":"fresh"}', version)
+    await cache.invalidate(1)
+
+    assert await cache.lookup(1) == (None, version + 1)
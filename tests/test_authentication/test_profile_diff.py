@@ -0,0 +1,160 @@
+import pytest
+from sqlalchemy import select
+
+from src import messages
+from src.exceptions.base_exceptions import (
+    DuplicatedObjectIds,
+    ObjectDoesNotExists,
+    ObjectsDoNotExists,
+)
+from src.models import UserRelatedFeatures
+from src.repositories import user_repository
+from src.schemas.user import UserUpdateSchema
+from src.services import user_service
+from tests.conftest import async_session_maker
+
+PROFILE = UserUpdateSchema(
+    first_name="Diff",
+    features=[
+        {"title": "languages", "values": [{"value": "en"}, {"value": "hy"}]},
+        {"title": "skills", "values": [{"value": "python"}]},
+    ],
+)
+
+
+async def _patch(user_id: int, payload: UserUpdateSchema):
+    async with async_session_maker() as session:
+        return await user_service.patch_user(
+            session=session, user_id=user_id, payload=payload
+        )
+
+
+async def test_resubmitted_profile_is_not_written(create_user):
+    user_id = (await create_user("profile_diff@mail.ru")).id
+
+    created = await _patch(user_id, PROFILE)
+
+    assert created.diff.user.updated == 1
+    assert created.diff.features.inserted == 2
+    assert created.diff.values.inserted == 3
+
+    resubmitted = await _patch(user_id, PROFILE)
+
+    assert resubmitted.diff.user.unchanged == 1
+    assert resubmitted.diff.features.unchanged == 2
+    assert resubmitted.diff.values.unchanged == 3
+
+    features = {feature.title: feature for feature in resubmitted.features}
+    languages, skills = features["languages"], features["skills"]
+    changed = await _patch(
+        user_id,
+        UserUpdateSchema(
+            features=[
+                {
+                    "id": languages.id,
+                    "title": "languages",
+                    "values": [{"id": languages.values[0].id, "value": "fr"}],
+                },
+            ]
+        ),
+    )
+
+    assert changed.diff.user.unchanged == 1
+    assert changed.diff.features.unchanged == 1
+    assert changed.diff.features.deleted == 1
+    assert changed.diff.values.updated == 1
+    assert changed.diff.values.deleted == 1
+    assert [feature.title for feature in changed.features] == ["languages"]
+    assert [value.value for value in changed.features[0].values] == ["fr"]
+    assert skills.id not in {feature.id for feature in changed.features}
+
+
+async def test_duplicated_ids_are_refused(create_user):
+    user_id = (await create_user("profile_diff_duplicates@mail.ru")).id
+
+    created = await _patch(user_id, PROFILE)
+    languages = next(
+        feature for feature in created.features if feature.title == "languages"
+    )
+    value_id = languages.values[0].id
+
+    with pytest.raises(DuplicatedObjectIds) as error:
+        await _patch(
+            user_id,
+            UserUpdateSchema(
+                features=[
+                    {
+                        "id": languages.id,
+                        "title": "languages",
+                        "values": [
+                            {"id": value_id, "value": "fr"},
+                            {"id": value_id, "value": "de"},
+                        ],
+                    },
+                ]
+            ),
+        )
+
+    assert error.value.status_code == 400
+    assert str(value_id) in error.value.detail
+
+    unchanged = await _patch(user_id, PROFILE)
+
+    assert unchanged.diff.values.unchanged == 3
+
+
+async def test_update_of_a_deleted_row_inserts_nothing(create_user):
+    user = await create_user("profile_diff_deleted@mail.ru")
+    missing_id = 2**31 - 1
+
+    async with async_session_maker() as session:
+        with pytest.raises(ObjectDoesNotExists):
+            await user_repository._update_rows(
+                session,
+                UserRelatedFeatures,
+                [{"title": "stale", "id": missing_id, "user_id": user.id}],
+                "user_id",
+            )
+        assert not await session.scalar(
+            select(UserRelatedFeatures.id).where(UserRelatedFeatures.id == missing_id)
+        )
+
+
+async def test_foreign_and_missing_value_ids_are_reported_at_once(create_user):
+    user_id = (await create_user("profile_diff_owner@mail.ru")).id
+    stranger_id = (await create_user("profile_diff_stranger@mail.ru")).id
+    languages = next(
+        feature
+        for feature in (await _patch(user_id, PROFILE)).features
+        if feature.title == "languages"
+    )
+    foreign_value_id = (await _patch(stranger_id, PROFILE)).features[0].values[0].id
+    missing_value_id = foreign_value_id + 1000
+
+    with pytest.raises(ObjectsDoNotExists) as error:
+        await _patch(
+            user_id,
+            UserUpdateSchema(
+                features=[
+                    {
+                        "id": languages.id,
+                        "title": "languages",
+                        "values": [
+                            {"id": languages.values[0].id, "value": "fr"},
+                            {"id": foreign_value_id, "value": "stolen"},
+                            {"id": missing_value_id, "value": "missing"},
+                        ],
+                    },
+                ]
+            ),
+        )
+
+    assert error.value.status_code == 404
+    assert error.value.detail == messages.OBJECTS_DO_NOT_EXISTS.format(
+        model="UserRelatedFeatureValue",
+        ids=f"{foreign_value_id}, {missing_value_id}",
+    )
+
+    unchanged = await _patch(user_id, PROFILE)
+
+    assert unchanged.diff.values.unchanged == 3
@@ -0,0 +1,69 @@
+import datetime
+import time
+import uuid
+
+from src.core.configs import settings
+from src.core.revocation import RevocationIndex
+from src.models import Token
+
+
+def test_revoked_token_is_indexed_by_jti():
+    index = RevocationIndex(staleness_bound=30)
+    token = Token(
+        access_jti=uuid.uuid4(),
+        refresh_jti=uuid.uuid4(),
+        created_at=datetime.datetime.utcnow(),
+        expires_at=datetime.datetime.utcnow() + datetime.timedelta(days=1),
+    )
+
+    assert not index.is_revoked(token.access_jti)
+
+    index.revoke_token(token)
+
+    assert index.is_revoked(token.access_jti)
+    assert not index.is_revoked(token.refresh_jti)
+
+
+def test_expired_entries_are_pruned():
+    index = RevocationIndex(staleness_bound=30)
+    expired_jti, live_jti = uuid.uuid4(), uuid.uuid4()
+    now = datetime.datetime.utcnow()
+    index.revoke(expired_jti, now - datetime.timedelta(seconds=1))
+    index.revoke(live_jti, now + datetime.timedelta(minutes=1))
+
+    index._prune()
+
+    assert not index.is_revoked(expired_jti)
+    assert index.is_revoked(live_jti)
+
+
+def test_revoked_pair_is_kept_until_the_access_token_expires():
+    index = RevocationIndex(staleness_bound=30)
+    now = datetime.datetime.utcnow()
+    access_lifetime = datetime.timedelta(minutes=settings.auth.access_token_lifetime)
+    old_token, recent_token = (
+        Token(
+            access_jti=uuid.uuid4(),
+            refresh_jti=uuid.uuid4(),
+            created_at=created_at,
+            expires_at=now + datetime.timedelta(days=1),
+        )
+        for created_at in (now - access_lifetime - datetime.timedelta(seconds=1), now)
+    )
+    index.revoke_token(old_token)
+    index.revoke_token(recent_token)
+
+    index._prune()
+
+    assert not index.is_revoked(old_token.access_jti)
+    assert index.is_revoked(recent_token.access_jti)
+
+
+def test_index_is_stale_until_synced():
+    index = RevocationIndex(staleness_bound=30)
+
+    assert index.is_stale()
+
+    index._synced_at = time.monotonic()
+
+    assert not index.is_stale()
@@ -0,0 +1,72 @@
+import datetime
+import uuid
+
+import pytest
+from fastapi.exceptions import HTTPException
+from sqlalchemy import text
+
+from src.core.unit_of_work import UnitOfWork
+from src.exceptions.auth_exceptions import UnAuthorized
+from src.repositories import token_repository
+from src.repositories import _token_repository
+from src.utils.auth_helpers import decode_jwt
+from tests.conftest import async_session_maker
+
+
+@pytest.fixture
+def issue_tokens(create_user):
+    async def issue(email: str):
+        user = await create_user(email)
+        async with async_session_maker() as session:
+            async with UnitOfWork(session):
+                tokens = await token_repository.tokenize(
+                    session=session, user_id=user.id
+                )
+        return decode_jwt(tokens.access_token), decode_jwt(tokens.refresh_token)
+
+    return issue
+
+
+async def test_rotation_refuses_taken_token_ids(monkeypatch, issue_tokens):
+    access_data, refresh_data = await issue_tokens("rotation@mail.ru")
+    taken_jti = uuid.UUID(hex=access_data["jti"])
+    monkeypatch.setattr(_token_repository.uuid, "uuid4", lambda: taken_jti)
+
+    async with async_session_maker() as session:
+        with pytest.raises(HTTPException) as error:
+            async with UnitOfWork(session):
+                await token_repository.refresh_token(
+                    session=session, token_data=refresh_data
+                )
+
+    assert error.value is UnAuthorized
+
+    monkeypatch.undo()
+    async with async_session_maker() as session:
+        async with UnitOfWork(session):
+            _, revoked = await token_repository.refresh_token(
+                session=session, token_data=refresh_data
+            )
+
+    assert revoked.access_jti == taken_jti
+
+
+async def test_rotation_takes_created_at_from_the_app_clock(issue_tokens):
+    _, refresh_data = await issue_tokens("rotation-clock@mail.ru")
+
+    async with async_session_maker() as session:
+        await session.execute(text("SET LOCAL TIME ZONE 'Asia/Yerevan'"))
+        issued_after = datetime.datetime.utcnow()
+        async with UnitOfWork(session):
+            new_tokens, _ = await token_repository.refresh_token(
+                session=session, token_data=refresh_data
+            )
+        issued_before = datetime.datetime.utcnow()
+
+    access_jti = uuid.UUID(hex=decode_jwt(new_tokens.access_token)["jti"])
+    async with async_session_maker() as session:
+        token = await token_repository.check_token_validity(
+            session=session, access_jti=access_jti
+        )
+
+    assert issued_after <= token.created_at <= issued_before
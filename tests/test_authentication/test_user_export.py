@@ -0,0 +1,64 @@
+import json
+
+from src.core.constants import DataFormats
+from src.schemas.user import UserFilterSchema, UserUpdateSchema
+from src.services import user_export_service, user_service
+from src.utils.export_helpers import buffered, serialize_records
+from tests.conftest import async_session_maker
+
+
+async def _records(*records: dict):
+    for record in records:
+        yield record
+
+
+async def _join(chunks) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+async def test_csv_rows_write_nested_values_as_json():
+    content = await _join(
+        serialize_records(
+            _records({"id": 1, "features": [{"title": "languages", "values": ["en"]}]}),
+            DataFormats.CSV,
+        )
+    )
+
+    assert content.splitlines() == [
+        "id,features",
+        '1,"[{""title"": ""languages"", ""values"": [""en""]}]"',
+    ]
+
+
+async def test_buffered_joins_small_chunks():
+    chunks = [chunk async for chunk in buffered(_records("a", "b", "c"), size=2)]
+
+    assert chunks == ["ab", "c"]
+
+
+async def test_export_streams_users_with_features(create_user):
+    email = "exported@mail.ru"
+    user = await create_user(email)
+    async with async_session_maker() as session:
+        await user_service.patch_user(
+            session=session,
+            user_id=user.id,
+            payload=UserUpdateSchema(
+                features=[{"title": "languages", "values": [{"value": "en"}]}]
+            ),
+        )
+
+    async with async_session_maker() as session:
+        lines = (
+            await _join(
+                user_export_service.export_users(
+                    session,
+                    data_format=DataFormats.NDJSON,
+                    filters=UserFilterSchema(is_active=False),
+                )
+            )
+        ).splitlines()
+
+    exported = {record["email"]: record for record in map(json.loads, lines)}
+    assert exported[email]["group"] == "Customer"
+    assert exported[email]["features"] == [{"title": "languages", "values": ["en"]}]
@@ -0,0 +1,74 @@
+import json
+
+from sqlalchemy import select
+
+from src import messages
+from src.core.configs import settings
+from src.core.constants import DataFormats
+from src.core.hashing import import_password_hasher
+from src.models import User
+from src.services import _user_import_service, user_import_service
+from src.utils.import_helpers import chunked, iter_records
+from tests.conftest import async_session_maker
+
+
+def test_csv_records_keep_line_numbers():
+    lines = [
+        "first_name,last_name,email,password\n",
+        "Import,User,first@mail.ru,Senior1234!\n",
+        "Import,User,second@mail.ru,Senior1234!\n",
+    ]
+
+    records = list(iter_records(lines, DataFormats.CSV))
+
+    assert [(line, record["email"]) for line, record, _ in records] == [
+        (2, "first@mail.ru"),
+        (3, "second@mail.ru"),
+    ]
+
+
+def test_invalid_ndjson_lines_are_reported():
+    lines = ['{"email": "first@mail.ru"}\n', "\n", "not json\n", "[1, 2]\n"]
+
+    records = list(iter_records(lines, DataFormats.NDJSON))
+
+    assert [line for line, _, _ in records] == [1, 3, 4]
+    assert [error for _, _, error in records] == [
+        None,
+        messages.INVALID_RECORD.format(data_format="ndjson"),
+        messages.INVALID_RECORD.format(data_format="ndjson"),
+    ]
+
+
+def test_chunked_does_not_lose_the_tail():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+async def test_import_reports_invalid_and_duplicated_rows(monkeypatch):
+    monkeypatch.setattr(import_password_hasher, "rounds", 4)
+    monkeypatch.setattr(settings.imports, "chunk_size", 2)
+    monkeypatch.setattr(_user_import_service, "async_session", async_session_maker)
+    user = dict(first_name="Import", last_name="User", password="Senior1234!")
+    lines = [
+        json.dumps({**user, "email": "imported_1@mail.ru"}),
+        json.dumps({**user, "email": "imported_2@mail.ru"}),
+        json.dumps({**user, "email": "imported_1@mail.ru"}),
+        json.dumps({**user, "email": "not an email"}),
+        json.dumps({**user, "email": "imported_3@mail.ru", "group_id": 1000}),
+    ]
+
+    summary = await user_import_service.import_users(
+        lines=lines, data_format=DataFormats.NDJSON, activate=True
+    )
+    async with async_session_maker() as session:
+        imported = await session.scalars(
+            select(User.email).where(User.email.like("imported_%"))
+        )
+
+    assert sorted(imported) == ["imported_1@mail.ru", "imported_2@mail.ru"]
+    assert (summary.total, summary.imported, summary.failed) == (5, 2, 3)
+    errors = {error.line: error for error in summary.errors}
+    assert sorted(errors) == [3, 4, 5]
+    assert errors[3].errors == [messages.EMAIL_DUPLICATION]
+    assert errors[4].errors[0].startswith("email")
+    assert errors[5].errors == [messages.USER_GROUP_DOES_NOT_EXISTS]
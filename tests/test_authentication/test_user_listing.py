@@ -0,0 +1,36 @@
+import datetime
+
+import pytest
+
+from src.exceptions.base_exceptions import InvalidCursor
+from src.schemas.user import UserFilterSchema
+from src.services import user_service
+from tests.conftest import async_session_maker
+
+
+async def test_pages_follow_the_cursor(create_user):
+    created_from = datetime.datetime.utcnow()
+    emails = [f"listed_{index}@mail.ru" for index in range(5)]
+    for email in emails:
+        await create_user(email, group_id=3)
+
+    filters = UserFilterSchema(group_id=3, created_from=created_from)
+    pages, cursor = [], None
+    async with async_session_maker() as session:
+        while True:
+            page = await user_service.list_users(
+                session=session, filters=filters, limit=2, cursor=cursor
+            )
+            pages.append([user.email for user in page.items])
+            if not (cursor := page.next_cursor):
+                break
+
+    assert pages == [emails[4:2:-1], emails[2:0:-1], emails[:1]]
+
+
+async def test_invalid_cursor_is_rejected():
+    async with async_session_maker() as session:
+        with pytest.raises(InvalidCursor):
+            await user_service.list_users(
+                session=session, filters=UserFilterSchema(), cursor="not a cursor"
+            )